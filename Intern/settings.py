@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.humanize',
     'application_tracking',
     'accounts',
+    'common',
     
 ]
 
@@ -49,6 +50,8 @@ AUTH_USER_MODEL = 'accounts.User'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'common.performance.PerformanceMiddleware',
+    'common.queries.QueryInspectorMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -84,6 +87,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file-backed test database, so concurrent-request tests get SQLite's normal
+        # busy-wait locking instead of shared-cache in-memory table locks
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        # Take the write lock when a transaction starts; deferred transactions that
+        # upgrade from read to write fail with 'database is locked' under concurrency
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
     }
 }
 
@@ -130,10 +139,82 @@ STATIC_ROOT= os.path.join(BASE_DIR,"static")
 MEDIA_URL='/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Largest CV the apply view accepts. Only that view streams its upload through
+# application_tracking.uploads.HashingFileUploadHandler; the rest of the site keeps
+# Django's default upload handlers.
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+
+# Set to 'X-Accel-Redirect' (nginx, with an internal location at CV_SENDFILE_PREFIX) or
+# 'X-Sendfile' (Apache/lighttpd) to let the proxy transfer CVs after the view authorizes them
+CV_SENDFILE_HEADER = None
+CV_SENDFILE_PREFIX = '/protected-media/'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    # CVs are stored once per distinct content and reference counted
+    'cvs': {
+        'BACKEND': 'common.storage.ContentAddressedStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 #EMAIL CONFIG
-EMAIL_BACKEND='django.core.mail.backends.console.EmailBackend'
\ No newline at end of file
+EMAIL_BACKEND='django.core.mail.backends.console.EmailBackend'
+
+#BOOTSTRAP CONFIG
+# Used by `manage.py bootstrap_admin` when no admin user exists yet. There is no default
+# password: set DEFAULT_ADMIN_PASSWORD in the environment or pass --password.
+DEFAULT_ADMIN_EMAIL = os.environ.get('DEFAULT_ADMIN_EMAIL', 'soumili@gmail.com')
+DEFAULT_ADMIN_PASSWORD = os.environ.get('DEFAULT_ADMIN_PASSWORD')
+
+#SEARCH CONFIG
+# None picks by database: the FTS5 index on SQLite (created by migration 0005), icontains elsewhere.
+JOB_SEARCH_BACKEND = None
+
+#CACHE CONFIG
+# Question payloads, advert listings and dashboards (application_tracking/caching.py) are invalidated by
+# deleting keys and bumping version counters, so every worker process must see the same cache. Use Redis
+# when REDIS_URL is set, otherwise a file cache that all processes on this host share (the SQLite database
+# already keeps the site on one host). A per-process backend such as LocMemCache serves stale pages from
+# the workers that did not handle the change; the application_tracking.W001 check warns about it.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'cache',
+        }
+    }
+
+#PERFORMANCE CONFIG
+# Per-view timings (common/performance.py), served at /auth/admin/performance/.
+# Off by default: the middleware then unloads itself and costs nothing.
+PERFORMANCE_MONITORING = os.environ.get('PERFORMANCE_MONITORING') == '1'
+PERFORMANCE_SAMPLE_SIZE = 1000
+
+#QUERY INSPECTOR CONFIG
+# Logs repeated (N+1) and slow queries per request while developing; see common/queries.py.
+QUERY_INSPECTOR = {
+    'ENABLED': DEBUG,
+    'SLOW_QUERY_MS': 100,
+    'DUPLICATE_THRESHOLD': 3,
+    'REPORTER': 'common.queries.log_problems',
+}
+# Query count per view that the test suite must not exceed.
+# Regenerate with UPDATE_QUERY_BASELINE=1 python manage.py test.
+QUERY_BASELINE_FILE = BASE_DIR / 'query_baseline.json'
@@ -15,9 +15,7 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.conf import settings
 from django.urls import path,include
-from django.conf.urls.static import static
 from application_tracking.views import list_adverts
 
 urlpatterns = [
@@ -25,4 +23,4 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/',include("accounts.urls")),
     path('',include("application_tracking.urls"))
-]+static(settings.MEDIA_URL, document_root = settings.MEDIA_ROOT)
+]
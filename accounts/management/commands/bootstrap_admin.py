@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the default admin user if no admin exists yet. Safe to run on every deploy; "
+        "the password comes from --password or DEFAULT_ADMIN_PASSWORD."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", default=settings.DEFAULT_ADMIN_EMAIL)
+        parser.add_argument("--password", default=getattr(settings, "DEFAULT_ADMIN_PASSWORD", None))
+
+    def handle(self, *args, **options):
+        if User.objects.filter(role="admin").exists():
+            self.stdout.write("An admin user already exists; nothing to do.")
+            return
+        if not options["password"]:
+            raise CommandError("No admin password: set DEFAULT_ADMIN_PASSWORD or pass --password.")
+        User.objects.create_user(email=options["email"], password=options["password"], role="admin")
+        self.stdout.write(self.style.SUCCESS(f"Created admin user {options['email']}."))
@@ -1,3 +1,365 @@
-from django.test import TestCase
+import csv
+import html
+import io
+import json
+import re
+from datetime import datetime, timedelta, timezone
+
+from django.core.cache import cache, caches
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone as django_timezone
+
+from application_tracking.caching import owner_version_key
+from application_tracking.models import (
+    CategoryStats, JobAdvert, JobApplication, QuestionStats, TestCategory, UserTestResult,
+)
+from common.performance import store as performance_store
+from common.testing import QueryCountMixin, create_advert, create_application, create_company, create_question
+from .models import User
+from .views import HOME_ADVERTS_PER_PAGE
+
+
+class AdminQueryCountTests(QueryCountMixin, TestCase):
+    ROWS = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email="admin@example.com", password="password", role="admin")
+        cls.category = TestCategory.objects.create(name="Python")
+        CategoryStats.objects.create(category=cls.category, attempts=1, score_sum=1)
+        for i in range(cls.ROWS):
+            candidate = User.objects.create_user(email=f"candidate{i}@example.com", password="password")
+            User.objects.create_user(email=f"company{i}@example.com", password="password", role="company")
+            UserTestResult.objects.create(user=candidate, category=cls.category, score=i, total=cls.ROWS)
+            QuestionStats.objects.create(question=create_question(cls.category), answered=2, correct=1)
+
+    def test_admin_candidates(self):
+        self.assertViewQueries(self.admin, reverse("admin_candidates"), "admin_candidates")
+
+    def test_admin_candidates_json(self):
+        self.assertViewQueries(self.admin, reverse("admin_candidates_json"), "admin_candidates_json")
+
+    def test_admin_companies(self):
+        self.assertViewQueries(self.admin, reverse("admin_companies"), "admin_companies")
+
+    def test_admin_questions(self):
+        self.assertViewQueries(self.admin, reverse("admin_questions"), "admin_questions")
+
+    def test_admin_assessment_stats(self):
+        url = reverse("admin_assessment_stats") + f"?category={self.category.id}"
+        self.assertViewQueries(self.admin, url, "admin_assessment_stats")
+
+
+class AdminCandidatesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email="admin@example.com", password="password", role="admin")
+        python = TestCategory.objects.create(name="Python")
+        go = TestCategory.objects.create(name="Go")
+        results = {
+            "alice": [(python, 3, 5), (python, 5, 5), (go, 1, 4)],
+            # The 0/0 attempt counts as an attempt but has no percentage.
+            "bob": [(python, 4, 5), (go, 0, 0)],
+            "carol": [],
+        }
+        for day, (name, attempts) in enumerate(results.items(), start=1):
+            candidate = User.objects.create_user(email=f"{name}@example.com", password="password")
+            User.objects.filter(pk=candidate.pk).update(created_at=datetime(2024, 1, day, tzinfo=timezone.utc))
+            for category, score, total in attempts:
+                UserTestResult.objects.create(user=candidate, category=category, score=score, total=total)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def candidates(self, sort):
+        response = self.client.get(reverse("admin_candidates_json"), {"sort": sort})
+        self.assertEqual(response.json()["sort"], sort)
+        return {candidate["email"].split("@")[0]: candidate for candidate in response.json()["results"]}
+
+    def test_sort_orders(self):
+        # Candidates without results sort last in both directions; ties fall back to the id.
+        expected = {
+            "email": ["alice", "bob", "carol"],
+            "joined": ["alice", "bob", "carol"],
+            "attempts": ["carol", "bob", "alice"],
+            "-attempts": ["alice", "bob", "carol"],
+            "best_score": ["bob", "alice", "carol"],
+            "-best_score": ["alice", "bob", "carol"],
+            "avg_percentage": ["alice", "bob", "carol"],
+            "-avg_percentage": ["bob", "alice", "carol"],
+            "password": ["alice", "bob", "carol"],
+        }
+        for sort, order in expected.items():
+            with self.subTest(sort):
+                self.assertEqual(list(self.candidates(sort)), order)
+        for sort in ("-email", "-joined"):
+            with self.subTest(sort):
+                self.assertEqual(list(self.candidates(sort)), ["carol", "bob", "alice"])
+
+    def test_aggregates(self):
+        candidates = self.candidates("email")
+
+        alice = candidates["alice"]
+        # (60 + 100 + 25) / 3
+        self.assertEqual((alice["attempts"], alice["best_score"], alice["avg_percentage"]), (3, 5, 61.67))
+        self.assertEqual(
+            [(row["name"], row["attempts"], row["best_score"], row["avg_percentage"]) for row in alice["categories"]],
+            [("Go", 1, 1, 25.0), ("Python", 2, 5, 80.0)],
+        )
+        bob = candidates["bob"]
+        self.assertEqual((bob["attempts"], bob["best_score"], bob["avg_percentage"]), (2, 4, 80.0))
+        self.assertEqual(
+            [(row["name"], row["attempts"], row["best_score"], row["avg_percentage"]) for row in bob["categories"]],
+            [("Go", 1, 0, None), ("Python", 1, 4, 80.0)],
+        )
+        carol = candidates["carol"]
+        self.assertEqual(
+            (carol["attempts"], carol["best_score"], carol["avg_percentage"], carol["categories"]), (0, None, None, [])
+        )
+
+    def test_html_page_lists_the_same_order(self):
+        response = self.client.get(reverse("admin_candidates"), {"sort": "-attempts"})
+        content = response.content.decode()
+        positions = [content.index(f"{name}@example.com") for name in ("alice", "bob", "carol")]
+        self.assertEqual(positions, sorted(positions))
+
+
+class AdminExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email="admin@example.com", password="password", role="admin")
+        company = create_company()
+        cls.advert = create_advert(company, title="Python Developer")
+        other_advert = create_advert(company, title="Rust Developer")
+        cls.early = create_application(cls.advert, email="early@example.com")
+        cls.late = create_application(cls.advert, email="late@example.com")
+        cls.other = create_application(other_advert, email="other@example.com")
+        for application, day in ((cls.early, 10), (cls.late, 20), (cls.other, 20)):
+            JobApplication.objects.filter(pk=application.pk).update(
+                created_at=datetime(2024, 1, day, 23, 30, tzinfo=timezone.utc)
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def export(self, dataset="applications", **params):
+        response = self.client.get(reverse("admin_export", args=[dataset]), params)
+        if response.status_code != 200:
+            return response, None
+        return response, b"".join(response.streaming_content).decode()
+
+    def emails(self, **params):
+        response, body = self.export(**params)
+        self.assertEqual(response.status_code, 200)
+        return [row["email"] for row in csv.DictReader(io.StringIO(body))]
+
+    def test_csv(self):
+        response, body = self.export()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="applications.csv"', response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(
+            rows[0], ["id", "advert_id", "advert_title", "name", "email", "status", "portfolio_url", "applied_at"]
+        )
+        self.assertEqual(len(rows), 4)
+
+    def test_csv_escapes_formulas(self):
+        JobApplication.objects.filter(pk=self.early.pk).update(name='=HYPERLINK("http://evil.example","x")')
+        JobAdvert.objects.filter(pk=self.advert.pk).update(title="@SUM(1+1)")
+
+        rows = {row["email"]: row for row in csv.DictReader(io.StringIO(self.export()[1]))}
+        self.assertEqual(rows["early@example.com"]["name"], '\'=HYPERLINK("http://evil.example","x")')
+        self.assertEqual(rows["early@example.com"]["advert_title"], "'@SUM(1+1)")
+        self.assertEqual(rows["other@example.com"]["name"], "Candidate")
+
+        records = {record["email"]: record for record in map(json.loads, self.export(format="jsonl")[1].splitlines())}
+        self.assertEqual(records["early@example.com"]["name"], '=HYPERLINK("http://evil.example","x")')
+
+    def test_jsonl(self):
+        response, body = self.export(format="jsonl", advert=self.advert.id)
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(records), 2)
+        early = next(record for record in records if record["email"] == "early@example.com")
+        self.assertEqual(early["advert_title"], "Python Developer")
+        self.assertEqual(early["id"], str(self.early.id))
+        self.assertEqual(early["applied_at"], "2024-01-10T23:30:00Z")
+
+    def test_filters(self):
+        self.assertCountEqual(self.emails(advert=self.advert.id), ["early@example.com", "late@example.com"])
+
+    def test_date_bounds_are_inclusive_days(self):
+        self.assertEqual(self.emails(since="2024-01-10", until="2024-01-10"), ["early@example.com"])
+        self.assertEqual(self.emails(until="2024-01-19"), ["early@example.com"])
+        self.assertCountEqual(self.emails(since="2024-01-11"), ["late@example.com", "other@example.com"])
+        self.assertEqual(self.emails(since="2024-01-21"), [])
+
+    def test_invalid_parameters(self):
+        for params in ({"advert": "not-an-id"}, {"since": "2024-13-01"}, {"until": "yesterday"}, {"format": "xml"}):
+            with self.subTest(params):
+                response, _ = self.export(**params)
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.export("users")[0].status_code, 404)
+
+    def test_test_results_and_answers(self):
+        category = TestCategory.objects.create(name="Python")
+        candidate = User.objects.create_user(email="candidate@example.com", password="password")
+        UserTestResult.objects.create(user=candidate, category=category, score=3, total=5)
+        UserTestResult.objects.create(user=candidate, category=TestCategory.objects.create(name="Go"), score=1, total=5)
+
+        _, body = self.export("test-results", category=category.id)
+        [row] = csv.DictReader(io.StringIO(body))
+        self.assertEqual((row["user_email"], row["category"], row["score"]), ("candidate@example.com", "Python", "3"))
+        self.assertEqual(self.export("answers", category=category.id)[1].splitlines(), [
+            "id,test_result_id,user_email,category_id,question_id,selected_option,is_correct,date_taken",
+        ])
+
+    def test_admins_only(self):
+        self.client.force_login(create_company("other@example.com"))
+        response = self.client.get(reverse("admin_export", args=["applications"]))
+        self.assertRedirects(response, reverse("search"), fetch_redirect_response=False)
+
+
+class BootstrapAdminTests(TestCase):
+
+    @override_settings(DEFAULT_ADMIN_PASSWORD=None)
+    def test_requires_a_password(self):
+        with self.assertRaisesMessage(CommandError, "No admin password"):
+            call_command("bootstrap_admin", stdout=io.StringIO())
+        self.assertFalse(User.objects.filter(role="admin").exists())
+
+    @override_settings(DEFAULT_ADMIN_PASSWORD=None)
+    def test_creates_the_admin_once(self):
+        call_command(
+            "bootstrap_admin", "--email", "root@example.com", "--password", "s3cret-pass", stdout=io.StringIO()
+        )
+        admin = User.objects.get(role="admin")
+        self.assertEqual(admin.email, "root@example.com")
+        self.assertTrue(admin.check_password("s3cret-pass"))
+
+        # Later deploys need no password once an admin exists.
+        out = io.StringIO()
+        call_command("bootstrap_admin", stdout=out)
+        self.assertIn("already exists", out.getvalue())
+        self.assertEqual(User.objects.filter(role="admin").count(), 1)
+
+    @override_settings(DEFAULT_ADMIN_EMAIL="env@example.com", DEFAULT_ADMIN_PASSWORD="from-environment")
+    def test_password_from_settings(self):
+        call_command("bootstrap_admin", stdout=io.StringIO())
+        self.assertTrue(User.objects.get(email="env@example.com", role="admin").check_password("from-environment"))
+
+
+class AdminPerformanceTests(TestCase):
+
+    def test_admins_only(self):
+        url = reverse("admin_performance")
+        self.client.force_login(User.objects.create_user(email="candidate@example.com", password="password"))
+        self.assertRedirects(self.client.get(url), reverse("search"), fetch_redirect_response=False)
+
+        admin = User.objects.create_user(email="admin@example.com", password="password", role="admin")
+        performance_store.reset()
+        self.addCleanup(performance_store.reset)
+        with override_settings(PERFORMANCE_MONITORING=True):
+            # A fresh client builds its middleware chain with monitoring on.
+            client = self.client_class()
+            client.force_login(admin)
+            client.get(reverse("admin_companies"))
+            payload = client.get(url).json()
+        self.assertTrue(payload["enabled"])
+        self.assertEqual(payload["views"]["admin_companies"]["count"], 1)
+
+
+def card(html_card):
+    """(title, applicants, status) of one advert card; the last two are None on the candidate listing."""
+    title = re.search(r"<h3>(.*?)</h3>", html_card).group(1)
+    applicants = re.search(r"Applicants:</strong> (\d+)", html_card)
+    status = re.search(r"Status:</strong>\s*(\w+)", html_card)
+    return title, applicants and int(applicants.group(1)), status and status.group(1)
+
+
+class HomeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.today = django_timezone.now().date()
+        self.company = create_company()
+        self.candidate = User.objects.create_user(email="candidate@example.com", password="password")
+
+    def cards(self, user, url_name, query=""):
+        """The advert cards on one page of a home listing, plus the Next link's query string (or None)."""
+        self.client.force_login(user)
+        response = self.client.get(reverse(url_name) + query)
+        self.assertEqual(response.status_code, 200)
+        listing = response.context["listing_html"]
+        cards = [card(part) for part in listing.split('class="job-card"')[1:]]
+        next_link = re.search(r'href="([^"]*)">Next', listing)
+        return cards, next_link and html.unescape(next_link.group(1))
+
+    def test_company_home_lists_its_own_adverts_with_status_and_applicants(self):
+        open_advert = create_advert(self.company, title="Open")
+        create_advert(self.company, title="Expired", deadline=self.today - timedelta(days=1))
+        unpublished = create_advert(self.company, title="Unpublished", is_published=False)
+        create_advert(self.company, title="Closes today", deadline=self.today)
+        create_advert(create_company("other@example.com"), title="Other company")
+        create_application(open_advert, "one@example.com")
+        create_application(open_advert, "two@example.com")
+        create_application(unpublished)
+
+        cards, next_query = self.cards(self.company, "company_home")
+
+        self.assertEqual(cards, [
+            ("Closes today", 0, "Open"),
+            ("Unpublished", 1, "Unpublished"),
+            ("Expired", 0, "Expired"),
+            ("Open", 2, "Open"),
+        ])
+        self.assertIsNone(next_query)
+
+    def test_candidate_home_lists_published_adverts_open_today(self):
+        create_advert(self.company, title="Open")
+        create_advert(create_company("other@example.com"), title="Other company")
+        create_advert(self.company, title="Closes today", deadline=self.today)
+        create_advert(self.company, title="Expired", deadline=self.today - timedelta(days=1))
+        create_advert(self.company, title="Unpublished", is_published=False)
+
+        cards, _ = self.cards(self.candidate, "candidate_home")
+
+        self.assertEqual([title for title, _, _ in cards], ["Closes today", "Other company", "Open"])
+
+    def test_cursor_paging(self):
+        for i in range(HOME_ADVERTS_PER_PAGE + 2):
+            create_advert(self.company, title=f"Advert {i:02}")
+        newest_first = [f"Advert {i:02}" for i in reversed(range(HOME_ADVERTS_PER_PAGE + 2))]
+
+        for user, url_name in ((self.company, "company_home"), (self.candidate, "candidate_home")):
+            with self.subTest(url_name):
+                first, next_query = self.cards(user, url_name)
+                second, last_query = self.cards(user, url_name, next_query)
+
+                self.assertEqual([card[0] for card in first + second], newest_first)
+                self.assertEqual(len(first), HOME_ADVERTS_PER_PAGE)
+                self.assertIsNone(last_query)
+
+    def test_applications_refresh_only_their_owners_home(self):
+        advert = create_advert(self.company, title="Open")
+        other = create_company("other@example.com")
+        create_advert(other, title="Other company")
+        # Another worker process reads the versions through its own connection to the shared cache.
+        other_worker = caches.create_connection("default")
+        self.assertEqual(self.cards(self.company, "company_home")[0], [("Open", 0, "Open")])
+        self.cards(other, "company_home")
+        versions = {user.id: other_worker.get(owner_version_key(user.id)) for user in (self.company, other)}
+
+        application = create_application(advert)
+
+        self.assertGreater(other_worker.get(owner_version_key(self.company.id)), versions[self.company.id])
+        self.assertEqual(other_worker.get(owner_version_key(other.id)), versions[other.id])
+        self.assertEqual(self.cards(self.company, "company_home")[0], [("Open", 1, "Open")])
+
+        application.delete()
+
+        self.assertEqual(self.cards(self.company, "company_home")[0], [("Open", 0, "Open")])
 
-# Create your tests here.
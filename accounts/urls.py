@@ -20,6 +20,10 @@ urlpatterns = [
     path("admin/dashboard/", views.admin_dashboard, name="admin_dashboard"),
     path("admin/companies/", views.admin_companies, name="admin_companies"),
     path("admin/candidates/", views.admin_candidates, name="admin_candidates"),
+    path("admin/candidates.json", views.admin_candidates_json, name="admin_candidates_json"),
+    path("admin/assessment-stats/", views.admin_assessment_stats, name="admin_assessment_stats"),
+    path("admin/performance/", views.admin_performance, name="admin_performance"),
+    path("admin/export/<str:dataset>/", views.admin_export, name="admin_export"),
     path("admin/add-question/", views.admin_add_question, name="admin_add_question"),
 
     # ✅ Question Management
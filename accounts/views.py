@@ -1,5 +1,5 @@
 from django.shortcuts import render, redirect
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 from django.contrib.auth.hashers import make_password
 from django.utils.crypto import get_random_string
 from datetime import datetime, timezone
@@ -238,19 +238,52 @@ def candidate_login(request):
 
 
 from django.contrib.auth.decorators import login_required
+from django.db.models import Count
+from django.template.loader import render_to_string
+from django.utils import timezone as django_timezone
+from django.utils.safestring import mark_safe
+from application_tracking.caching import get_cached_listing, home_key, set_cached_listing
 from application_tracking.models import JobAdvert
+from common.pagination import CursorPaginator
+
+HOME_ADVERTS_PER_PAGE = 10
+# What the advert cards show; the description in particular is never loaded here.
+ADVERT_CARD_FIELDS = ("id", "title", "company_name", "job_type", "skills", "created_at")
+
+
+def cached_home_listing(request, kind, template, job_adverts):
+    """Render a page of ``job_adverts`` with ``template``, cached per user, page and day."""
+    today = django_timezone.now().date()
+    cursor = request.GET.get("cursor") or ""
+    key = home_key(kind, request.user.id, cursor, today)
+    listing_html = get_cached_listing(key)
+    if listing_html is None:
+        page = CursorPaginator(job_adverts(today), HOME_ADVERTS_PER_PAGE).get_page(cursor)
+        listing_html = render_to_string(template, {"job_adverts": page, "current_date": today}, request=request)
+        set_cached_listing(key, listing_html)
+    return mark_safe(listing_html)
 
 
 @login_required
 def company_home(request):
-    job_adverts = JobAdvert.objects.all()  # or filter for company-specific jobs if needed
-    return render(request, "home3.html", {"job_adverts": job_adverts})
+    def job_adverts(today):
+        return (
+            JobAdvert.objects.filter(created_by=request.user)
+            .only(*ADVERT_CARD_FIELDS, "is_published", "deadline")
+            .annotate(total_applicants=Count("applications"))
+        )
+
+    listing_html = cached_home_listing(request, "company", "company_advert_listing.html", job_adverts)
+    return render(request, "home3.html", {"listing_html": listing_html})
 
 
 @login_required
 def candidate_home(request):
-    job_adverts = JobAdvert.objects.all()  # or filter for company-specific jobs if needed
-    return render(request, "home.html", {"job_adverts": job_adverts})
+    def job_adverts(today):
+        return JobAdvert.objects.filter(is_published=True, deadline__gte=today).only(*ADVERT_CARD_FIELDS)
+
+    listing_html = cached_home_listing(request, "candidate", "advert_listing.html", job_adverts)
+    return render(request, "home.html", {"listing_html": listing_html})
 
 
 from django.shortcuts import redirect
@@ -286,12 +319,186 @@ def admin_companies(request):
 
 from application_tracking.models import UserTestResult
 
+from django.core.paginator import Paginator
+from django.db.models import Avg, Count, F, FloatField, Max
+from django.db.models.functions import NullIf
+from django.http import JsonResponse
+
+CANDIDATES_PER_PAGE = 25
+CANDIDATE_SORTS = {
+    "email": "email",
+    "joined": "created_at",
+    "attempts": "attempts",
+    "best_score": "best_score",
+    "avg_percentage": "avg_percentage",
+}
+
+
+def percentage(score, total):
+    # NULL for results with no questions instead of a division by zero.
+    return F(score) * 100.0 / NullIf(F(total), 0)
+
+
+def candidate_queryset(sort):
+    """Candidates with their test aggregates computed by the database, ordered by ``sort``."""
+    candidates = User.objects.filter(role="candidate").only("id", "email", "created_at").annotate(
+        attempts=Count("usertestresult"),
+        best_score=Max("usertestresult__score"),
+        avg_percentage=Avg(
+            percentage("usertestresult__score", "usertestresult__total"), output_field=FloatField()
+        ),
+    )
+    field = CANDIDATE_SORTS.get(sort.lstrip("-"), "created_at")
+    order = F(field).desc(nulls_last=True) if sort.startswith("-") else F(field).asc(nulls_last=True)
+    return candidates.order_by(order, "id")
+
+
+def attach_category_stats(candidates):
+    """Add ``category_stats`` (per TestCategory aggregates) to each candidate, in one grouped query."""
+    stats = {candidate.id: [] for candidate in candidates}
+    rows = (
+        UserTestResult.objects.filter(user_id__in=stats)
+        .values("user_id", "category_id", "category__name")
+        .annotate(
+            attempts=Count("id"),
+            best_score=Max("score"),
+            avg_percentage=Avg(percentage("score", "total"), output_field=FloatField()),
+        )
+        .order_by("category__name")
+    )
+    for row in rows:
+        stats[row["user_id"]].append(row)
+    for candidate in candidates:
+        candidate.category_stats = stats[candidate.id]
+    return candidates
+
+
+def candidate_page(request):
+    sort = request.GET.get("sort", "-joined")
+    paginator = Paginator(candidate_queryset(sort), CANDIDATES_PER_PAGE)
+    page = paginator.get_page(request.GET.get("page"))
+    attach_category_stats(page.object_list)
+    return page, sort
+
+
 @login_required
 @admin_required
 def admin_candidates(request):
-    # Fetch candidates with their test results in one query
-    candidates = User.objects.filter(role="candidate").prefetch_related("usertestresult_set")
-    return render(request, "admin_candidates.html", {"candidates": candidates})
+    page, sort = candidate_page(request)
+    return render(request, "admin_candidates.html", {"candidates": page, "sort": sort})
+
+
+@login_required
+@admin_required
+def admin_candidates_json(request):
+    page, sort = candidate_page(request)
+
+    def rounded(value):
+        return None if value is None else round(value, 2)
+
+    results = [
+        {
+            "id": str(candidate.id),
+            "email": candidate.email,
+            "joined": candidate.created_at.isoformat(),
+            "attempts": candidate.attempts,
+            "best_score": candidate.best_score,
+            "avg_percentage": rounded(candidate.avg_percentage),
+            "categories": [
+                {
+                    "id": row["category_id"],
+                    "name": row["category__name"],
+                    "attempts": row["attempts"],
+                    "best_score": row["best_score"],
+                    "avg_percentage": rounded(row["avg_percentage"]),
+                }
+                for row in candidate.category_stats
+            ],
+        }
+        for candidate in page
+    ]
+    return JsonResponse({
+        "count": page.paginator.count,
+        "page": page.number,
+        "num_pages": page.paginator.num_pages,
+        "sort": sort,
+        "results": results,
+    })
+
+
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from application_tracking.exports import EXPORTS, ExportFilterError
+from common.streaming import csv_stream, jsonl_stream
+
+EXPORT_FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+@login_required
+@admin_required
+def admin_export(request, dataset):
+    """
+    Stream applications, test results or answers as CSV or JSON Lines.
+
+    Filters: ``advert``, ``category``, ``test_result`` (where the dataset has
+    them), ``since`` and ``until`` (YYYY-MM-DD); ``format`` is csv or jsonl.
+    CSV cells that a spreadsheet would run as formulas are escaped by
+    csv_stream, the same as in the CV export's manifest; JSON Lines keep the
+    raw values.
+    """
+    export = EXPORTS.get(dataset)
+    if export is None:
+        raise Http404("Unknown export.")
+    export_format = request.GET.get("format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest("'format' must be csv or jsonl.")
+    try:
+        rows = export.rows(request.GET)
+    except ExportFilterError as error:
+        return HttpResponseBadRequest(str(error))
+
+    if export_format == "csv":
+        content = csv_stream(export.header, rows)
+    else:
+        content = jsonl_stream(export.dicts(rows))
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[export_format])
+    response["Content-Disposition"] = content_disposition_header(True, f"{dataset}.{export_format}")
+    return response
+
+
+from application_tracking.models import CategoryStats, QuestionStats
+
+@login_required
+@admin_required
+def admin_assessment_stats(request):
+    # Reads the materialized CategoryStats/QuestionStats rows only, never the raw answers
+    category_stats = CategoryStats.objects.select_related("category").order_by("category__name")
+    selected = request.GET.get("category")
+    questions = []
+    if selected and selected.isdigit():
+        questions = (
+            QuestionStats.objects.filter(question__category_id=selected, answered__gt=0)
+            .select_related("question")
+            .only("answered", "correct", "discrimination", "point_biserial", "question__id", "question__question_text")
+            .order_by(F("correct") * 1.0 / F("answered"), "question_id")
+        )
+    return render(request, "admin_assessment_stats.html", {
+        "category_stats": category_stats,
+        "questions": questions,
+        "selected": selected,
+    })
+
+
+from django.conf import settings
+from common.performance import store as performance_store
+
+@login_required
+@admin_required
+def admin_performance(request):
+    # Percentiles over the recent requests served by this process only
+    return JsonResponse({
+        "enabled": getattr(settings, "PERFORMANCE_MONITORING", False),
+        "views": performance_store.summary(),
+    })
 
 
 # Add questions page
@@ -0,0 +1,157 @@
+"""
+Cached question payloads, advert listings and dashboards.
+
+Invalidation works by deleting keys and bumping version counters held in the
+cache itself, so the cache must be shared by every worker process (see
+CACHES in settings). With a per-process cache a change only reaches the
+worker that made it; the others keep serving their own copies until the
+entries expire.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+
+from .models import Question
+
+QUESTION_CACHE_TIMEOUT = 60 * 60
+LISTING_CACHE_TIMEOUT = 5 * 60
+LISTING_VERSION_KEY = "advert_listing:version"
+LISTING_STATS_KEYS = {"hits": "advert_listing:hits", "misses": "advert_listing:misses"}
+# No correct_option: a cached payload may be stale until invalidated, so submissions are graded from the database.
+QUESTION_FIELDS = ("id", "category_id", "question_text", "option1", "option2", "option3", "option4")
+
+
+def question_pool_key(category_id) -> str:
+    return f"question_pool:{category_id}"
+
+
+def question_key(question_id) -> str:
+    return f"question:{question_id}"
+
+
+def get_question_pool_ids(category_id) -> list[int]:
+    """All question ids of a category, served from the cache after the first call."""
+    key = question_pool_key(category_id)
+    pool_ids = cache.get(key)
+    if pool_ids is None:
+        pool_ids = list(Question.objects.filter(category_id=category_id).values_list("id", flat=True))
+        cache.set(key, pool_ids, QUESTION_CACHE_TIMEOUT)
+    return pool_ids
+
+
+def get_questions(category_id, question_ids) -> list[dict]:
+    """
+    Question payloads for ``question_ids`` in the given order, as plain dicts.
+
+    Cached payloads are read with one get_many; only the misses hit the
+    database, in a single query. Ids that no longer belong to the category
+    are dropped.
+    """
+    cached = cache.get_many([question_key(pk) for pk in question_ids])
+    payloads = {payload["id"]: payload for payload in cached.values()}
+
+    missing = [pk for pk in question_ids if pk not in payloads]
+    if missing:
+        fetched = {row["id"]: row for row in Question.objects.filter(pk__in=missing).values(*QUESTION_FIELDS)}
+        cache.set_many({question_key(pk): row for pk, row in fetched.items()}, QUESTION_CACHE_TIMEOUT)
+        payloads.update(fetched)
+
+    return [
+        payloads[pk] for pk in question_ids
+        if pk in payloads and payloads[pk]["category_id"] == category_id
+    ]
+
+
+def invalidate_question(question_id, *category_ids) -> None:
+    cache.delete_many([question_key(question_id)] + [question_pool_key(pk) for pk in category_ids])
+
+
+def _version(key: str) -> int:
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a version lost to eviction never rewinds onto stale entries.
+        cache.add(key, int(time.time()), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key: str) -> None:
+    # FileBasedCache increments by read-then-write, so two concurrent bumps may
+    # both land on the same number; either way the version moves past the old one.
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time()), None)
+
+
+def _listing_version() -> int:
+    return _version(LISTING_VERSION_KEY)
+
+
+def bump_listing_version() -> None:
+    """Invalidate every cached listing page and count in one step."""
+    _bump(LISTING_VERSION_KEY)
+
+
+def owner_version_key(user_id) -> str:
+    return f"advert_owner:version:{user_id}"
+
+
+def bump_owner_listing_version(user_id) -> None:
+    """Invalidate the cached dashboard of one advert owner (e.g. when an applicant count changes)."""
+    _bump(owner_version_key(user_id))
+
+
+def _digest(parts) -> str:
+    return hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def listing_key(kind: str, *parts) -> str:
+    return f"advert_listing:{kind}:{_listing_version()}:{_digest(parts)}"
+
+
+def home_key(kind: str, user_id, *parts) -> str:
+    """
+    Key for a user's post-login dashboard page. It changes with any advert
+    save or delete (the listing version) and with changes to the user's own
+    adverts' applications (the owner version).
+    """
+    versions = f"{_listing_version()}:{_version(owner_version_key(user_id))}"
+    return f"home:{kind}:{user_id}:{versions}:{_digest(parts)}"
+
+
+def _record(outcome: str) -> None:
+    key = LISTING_STATS_KEYS[outcome]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_cached_listing(key: str):
+    value = cache.get(key)
+    _record("misses" if value is None else "hits")
+    return value
+
+
+def set_cached_listing(key: str, value) -> None:
+    cache.set(key, value, LISTING_CACHE_TIMEOUT)
+
+
+def listing_cache_stats() -> dict:
+    """
+    Hit/miss counts of the listing and dashboard caches across every worker
+    (the counters live in the shared cache). They are exact on Redis; on the
+    file cache concurrent lookups can occasionally drop a count.
+    """
+    stats = cache.get_many(LISTING_STATS_KEYS.values())
+    hits = stats.get(LISTING_STATS_KEYS["hits"], 0)
+    misses = stats.get(LISTING_STATS_KEYS["misses"], 0)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        "version": _listing_version(),
+    }
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PER_PROCESS_BACKENDS = {"django.core.cache.backends.locmem.LocMemCache"}
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """The caches in caching.py are invalidated through the cache itself, so it must be shared between workers."""
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if backend not in PER_PROCESS_BACKENDS:
+        return []
+    return [Warning(
+        f"The default cache ({backend}) is private to each process.",
+        hint=(
+            "Question, listing and dashboard invalidations would only reach the worker that made them. "
+            "Use a shared backend such as RedisCache or FileBasedCache."
+        ),
+        id="application_tracking.W001",
+    )]
@@ -0,0 +1,117 @@
+from datetime import datetime, time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import JobApplication, UserAnswer, UserTestResult
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class ExportFilterError(ValueError):
+    pass
+
+
+class Export:
+    """
+    A flat, filterable export of one model.
+
+    ``columns`` maps output column names to ``values_list`` lookups, so rows
+    come straight from the cursor as tuples without building model instances.
+    ``filters`` maps query parameters to lookups; ``date_field`` backs the
+    ``since``/``until`` parameters (inclusive dates).
+    """
+
+    def __init__(self, model, columns, *, date_field, filters):
+        self.model = model
+        self.columns = columns
+        self.date_field = date_field
+        self.filters = filters
+
+    @property
+    def header(self):
+        return tuple(self.columns)
+
+    def queryset(self, params):
+        queryset = self.model.objects.all()
+        for param, lookup in self.filters.items():
+            value = params.get(param)
+            if not value:
+                continue
+            try:
+                queryset = queryset.filter(**{lookup: value})
+            except (ValueError, ValidationError):
+                raise ExportFilterError(f"'{param}' is not a valid id.")
+        # Compare the raw column against day boundaries (rather than a __date
+        # transform) so an index on the date field stays usable.
+        for param, lookup, days in (("since", "gte", 0), ("until", "lt", 1)):
+            value = params.get(param)
+            if not value:
+                continue
+            try:
+                day = parse_date(value)
+            except ValueError:
+                day = None
+            if day is None:
+                raise ExportFilterError(f"'{param}' must be a date in YYYY-MM-DD format.")
+            boundary = timezone.make_aware(datetime.combine(day + timedelta(days=days), time.min))
+            queryset = queryset.filter(**{f"{self.date_field}__{lookup}": boundary})
+        return queryset.order_by("pk").values_list(*self.columns.values())
+
+    def rows(self, params):
+        """Validate ``params`` eagerly, then return a lazy iterator over the matching rows."""
+        queryset = self.queryset(params)
+        return queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    def dicts(self, rows):
+        header = self.header
+        return (dict(zip(header, row)) for row in rows)
+
+
+EXPORTS = {
+    "applications": Export(
+        JobApplication,
+        {
+            "id": "id",
+            "advert_id": "job_advert_id",
+            "advert_title": "job_advert__title",
+            "name": "name",
+            "email": "email",
+            "status": "status",
+            "portfolio_url": "portfolio_url",
+            "applied_at": "created_at",
+        },
+        date_field="created_at",
+        filters={"advert": "job_advert_id"},
+    ),
+    "test-results": Export(
+        UserTestResult,
+        {
+            "id": "id",
+            "user_email": "user__email",
+            "category_id": "category_id",
+            "category": "category__name",
+            "score": "score",
+            "total": "total",
+            "date_taken": "date_taken",
+        },
+        date_field="date_taken",
+        filters={"category": "category_id"},
+    ),
+    "answers": Export(
+        UserAnswer,
+        {
+            "id": "id",
+            "test_result_id": "test_result_id",
+            "user_email": "user__email",
+            "category_id": "question__category_id",
+            "question_id": "question_id",
+            "selected_option": "selected_option",
+            "is_correct": "is_correct",
+            "date_taken": "test_result__date_taken",
+        },
+        date_field="test_result__date_taken",
+        filters={"category": "question__category_id", "test_result": "test_result_id"},
+    ),
+}
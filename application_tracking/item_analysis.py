@@ -0,0 +1,138 @@
+"""
+Classical item analysis over every recorded answer, computed with NumPy.
+
+Answers are read from the database in chunks and folded into per-question
+running sums with ``np.bincount``, so memory grows with the number of
+questions rather than the number of answers. For each question:
+
+* difficulty: the proportion of answers that were correct;
+* discrimination: correct rate among the top 27% of attempts in the
+  category minus the rate among the bottom 27% (ranked by percentage score);
+* point-biserial: correlation between answering the item correctly and the
+  rest of the attempt's score (the attempt's percentage without this item).
+
+NumPy is an optional dependency; only the analyse_items and
+benchmark_item_analysis commands import this module.
+"""
+from itertools import islice
+
+import numpy as np
+from django.db import connection
+
+from .models import UserAnswer, UserTestResult
+
+GROUP_FRACTION = 0.27
+DEFAULT_CHUNK_SIZE = 100_000
+
+ANSWER_COLUMNS = ("question_id", "is_correct", "test_result__score", "test_result__total", "test_result__category_id")
+SUMS = ("n", "x", "r", "rr", "xr", "upper_n", "upper_x", "lower_n", "lower_x")
+
+
+def group_cutoffs(categories, scores, totals):
+    """
+    Percentage scores bounding the bottom and top GROUP_FRACTION of attempts
+    in each category, as two arrays indexed by category id (NaN where a
+    category has no attempts, which puts none of its answers in either group).
+    """
+    size = int(categories.max()) + 1 if len(categories) else 0
+    lower, upper = np.full(size, np.nan), np.full(size, np.nan)
+    graded = totals > 0
+    categories, percentages = categories[graded], scores[graded] / totals[graded]
+    for category in np.unique(categories):
+        in_category = percentages[categories == category]
+        lower[category], upper[category] = np.quantile(in_category, [GROUP_FRACTION, 1 - GROUP_FRACTION])
+    return lower, upper
+
+
+class ItemAnalysis:
+    """Accumulates per-question sums chunk by chunk; ``results()`` turns them into statistics."""
+
+    def __init__(self, lower_cutoffs, upper_cutoffs, size=0):
+        self.lower_cutoffs = lower_cutoffs
+        self.upper_cutoffs = upper_cutoffs
+        self.sums = {name: np.zeros(size) for name in SUMS}
+
+    @property
+    def size(self):
+        return len(self.sums["n"])
+
+    def add(self, question_ids, correct, scores, totals, categories):
+        """Fold in one chunk of answers (parallel integer arrays, one entry per answer)."""
+        if not len(question_ids):
+            return
+        size = max(self.size, int(question_ids.max()) + 1)
+        if size > self.size:
+            self.sums = {name: np.pad(values, (0, size - self.size)) for name, values in self.sums.items()}
+
+        x = correct.astype(np.float64)
+        rest = (scores - x) / np.maximum(totals - 1, 1)
+        # An ungraded attempt (total 0) has a NaN percentage, which puts it in neither group.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentage = scores / totals
+            upper = percentage >= self.upper_cutoffs[categories]
+            lower = percentage <= self.lower_cutoffs[categories]
+
+        def total(weights=None):
+            return np.bincount(question_ids, weights=weights, minlength=size)
+
+        self.sums["n"] += total()
+        self.sums["x"] += total(x)
+        self.sums["r"] += total(rest)
+        self.sums["rr"] += total(rest * rest)
+        self.sums["xr"] += total(x * rest)
+        self.sums["upper_n"] += total(upper)
+        self.sums["upper_x"] += total(x * upper)
+        self.sums["lower_n"] += total(lower)
+        self.sums["lower_x"] += total(x * lower)
+
+    def results(self):
+        """``{question_id: (answered, correct, difficulty, discrimination, point_biserial)}``; NaN becomes None."""
+        s = self.sums
+        with np.errstate(divide="ignore", invalid="ignore"):
+            difficulty = s["x"] / s["n"]
+            mean_rest = s["r"] / s["n"]
+            covariance = s["xr"] / s["n"] - difficulty * mean_rest
+            variance = difficulty * (1 - difficulty) * (s["rr"] / s["n"] - mean_rest ** 2)
+            point_biserial = np.where(variance > 0, covariance / np.sqrt(variance), np.nan)
+            discrimination = s["upper_x"] / s["upper_n"] - s["lower_x"] / s["lower_n"]
+
+        def value(array, i):
+            return None if np.isnan(array[i]) else float(array[i])
+
+        return {
+            int(i): (int(s["n"][i]), int(s["x"][i]), value(difficulty, i), value(discrimination, i), value(point_biserial, i))
+            for i in np.flatnonzero(s["n"])
+        }
+
+
+def answer_chunks(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the answers as ``(chunk_size, 5)`` integer arrays in ANSWER_COLUMNS order."""
+    queryset = UserAnswer.objects.order_by().values_list(*ANSWER_COLUMNS)
+    sql, params = queryset.query.sql_with_params()
+    # A chunked (server-side where supported) cursor, so rows are not all fetched at once.
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(chunk_size):
+            yield np.array(rows, dtype=np.int64)
+
+
+def attempt_arrays(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Every attempt's ``(category_id, score, total)`` as one ``(n, 3)`` integer array, read in chunks."""
+    rows = (
+        UserTestResult.objects.order_by()
+        .values_list("category_id", "score", "total")
+        .iterator(chunk_size=chunk_size)
+    )
+    chunks = []
+    while batch := list(islice(rows, chunk_size)):
+        chunks.append(np.array(batch, dtype=np.int64))
+    return np.concatenate(chunks) if chunks else np.empty((0, 3), dtype=np.int64)
+
+
+def analyse_answers(chunk_size=DEFAULT_CHUNK_SIZE):
+    attempts = attempt_arrays(chunk_size)
+    lower, upper = group_cutoffs(attempts[:, 0], attempts[:, 1], attempts[:, 2])
+    analysis = ItemAnalysis(lower, upper)
+    for chunk in answer_chunks(chunk_size):
+        analysis.add(*chunk.T)
+    return analysis.results()
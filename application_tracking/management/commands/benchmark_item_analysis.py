@@ -0,0 +1,156 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from application_tracking.models import UserAnswer
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the item analysis over the answers in the database, reporting the chunked read into NumPy "
+        "and the vectorized statistics separately (seed ~10M answers first with "
+        "`generate_synthetic_data --scale large`). --in-memory times the statistics alone on a synthetic "
+        "answer set that never touches the database. Needs NumPy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=100_000)
+        parser.add_argument(
+            "--in-memory", action="store_true",
+            help="Generate the answers in memory instead of reading them from the database.",
+        )
+        parser.add_argument("--answers", type=int, default=10_000_000, help="With --in-memory only.")
+        parser.add_argument("--questions", type=int, default=2_000, help="With --in-memory only.")
+        parser.add_argument("--categories", type=int, default=10, help="With --in-memory only.")
+        parser.add_argument("--questions-per-test", type=int, default=20, help="With --in-memory only.")
+        parser.add_argument("--seed", type=int, default=0, help="With --in-memory only.")
+
+    def handle(self, *args, **options):
+        try:
+            import numpy as np
+        except ImportError:
+            raise CommandError("The benchmark needs NumPy; install it with `pip install numpy`.")
+
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        if options["in_memory"]:
+            answers, results, analysed = self.in_memory(np, options)
+        else:
+            answers, results, analysed = self.from_database(options["chunk_size"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Analysed {answers:,} answers over {len(results):,} questions in {analysed:.2f}s "
+            f"({answers / analysed:,.0f} answers/s)"
+        ))
+        point_biserial = np.array([r[4] for r in results.values() if r[4] is not None])
+        discrimination = np.array([r[3] for r in results.values() if r[3] is not None])
+        if len(point_biserial) and len(discrimination):
+            self.stdout.write(
+                f"Mean point-biserial {point_biserial.mean():.3f}, mean discrimination {discrimination.mean():.3f}"
+            )
+
+    def from_database(self, chunk_size):
+        """The path analyse_items runs: chunked reads into NumPy arrays, each folded in as it arrives."""
+        from application_tracking.item_analysis import ItemAnalysis, answer_chunks, attempt_arrays, group_cutoffs
+
+        if not UserAnswer.objects.exists():
+            raise CommandError(
+                "There are no answers in the database; seed some with `generate_synthetic_data` or pass --in-memory."
+            )
+        read = analysed = 0.0
+        started = time.perf_counter()
+        attempts = attempt_arrays(chunk_size)
+        read += time.perf_counter() - started
+
+        started = time.perf_counter()
+        analysis = ItemAnalysis(*group_cutoffs(attempts[:, 0], attempts[:, 1], attempts[:, 2]))
+        analysed += time.perf_counter() - started
+
+        answers = 0
+        chunks = answer_chunks(chunk_size)
+        while True:
+            started = time.perf_counter()
+            chunk = next(chunks, None)
+            read += time.perf_counter() - started
+            if chunk is None:
+                break
+            started = time.perf_counter()
+            analysis.add(*chunk.T)
+            analysed += time.perf_counter() - started
+            answers += len(chunk)
+
+        started = time.perf_counter()
+        results = analysis.results()
+        analysed += time.perf_counter() - started
+
+        self.stdout.write(
+            f"Read {answers:,} answers ({len(attempts):,} attempts) from {connection.vendor} into NumPy "
+            f"in {read:.2f}s ({answers / read:,.0f} answers/s)"
+        )
+        return answers, results, analysed
+
+    def in_memory(self, np, options):
+        from application_tracking.item_analysis import ItemAnalysis, group_cutoffs
+
+        rng = np.random.default_rng(options["seed"])
+        per_test = options["questions_per_test"]
+        chunk_size = max(options["chunk_size"] // per_test, 1) * per_test
+        attempts = options["answers"] // per_test
+        question_difficulty = rng.normal(0, 1, options["questions"])
+        question_category = rng.integers(0, options["categories"], options["questions"])
+
+        pools = [np.flatnonzero(question_category == c) for c in range(options["categories"])]
+
+        def synthetic_chunks():
+            """
+            One-parameter logistic (Rasch) model: P(correct) = sigmoid(ability - difficulty).
+            Each chunk has its own seeded generator, so every pass yields the same data.
+            """
+            for index, start in enumerate(range(0, attempts, chunk_size // per_test)):
+                chunk_rng = np.random.default_rng([options["seed"], index])
+                count = min(chunk_size // per_test, attempts - start)
+                categories = chunk_rng.integers(0, options["categories"], count)
+                questions = np.stack([chunk_rng.choice(pools[c], per_test) for c in categories])
+                ability = chunk_rng.normal(0, 1, (count, 1))
+                p_correct = 1 / (1 + np.exp(question_difficulty[questions] - ability))
+                correct = chunk_rng.random((count, per_test)) < p_correct
+                yield categories, questions, correct
+
+        def answer_arrays(categories, questions, correct):
+            scores = correct.sum(axis=1)
+            return (
+                questions.ravel(),
+                correct.ravel().astype(np.int64),
+                np.repeat(scores, per_test),
+                np.full(correct.size, per_test),
+                np.repeat(categories, per_test),
+            )
+
+        # First pass: only the attempt scores, to place the 27% group cut-offs.
+        started = time.perf_counter()
+        attempt_categories, attempt_scores = [], []
+        for categories, _, correct in synthetic_chunks():
+            attempt_categories.append(categories)
+            attempt_scores.append(correct.sum(axis=1))
+        scores = np.concatenate(attempt_scores)
+        lower, upper = group_cutoffs(np.concatenate(attempt_categories), scores, np.full(len(scores), per_test))
+        generated = time.perf_counter() - started
+
+        # Second pass: regenerate each chunk and time only the analysis itself.
+        elapsed = 0.0
+        analysis = ItemAnalysis(lower, upper, size=options["questions"])
+        for chunk in synthetic_chunks():
+            arrays = answer_arrays(*chunk)
+            started = time.perf_counter()
+            analysis.add(*arrays)
+            elapsed += time.perf_counter() - started
+        started = time.perf_counter()
+        results = analysis.results()
+        elapsed += time.perf_counter() - started
+
+        answers = attempts * per_test
+        self.stdout.write(
+            f"Generated {answers:,} answers ({attempts:,} attempts) and placed the group cut-offs in {generated:.2f}s"
+        )
+        return answers, results, elapsed
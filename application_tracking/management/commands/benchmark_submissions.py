@@ -0,0 +1,129 @@
+import queue
+import random
+import statistics
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from accounts.models import User
+from application_tracking.models import Question, TestCategory
+from application_tracking.views import QUESTIONS_PER_TEST
+from common.performance import percentile
+from common.queries import inspect_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "POST take_test submissions from concurrent clients and report submissions/sec and latency. "
+        "Writes a throwaway category, questions and candidate to the current database and removes them after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--submissions", type=int, default=200, help="Timed submissions in total.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Clients submitting at the same time.")
+        parser.add_argument("--questions", type=int, default=QUESTIONS_PER_TEST + 5, help="Questions in the pool.")
+
+    def handle(self, *args, **options):
+        if options["submissions"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--submissions and --concurrency must be at least 1.")
+        if options["questions"] < QUESTIONS_PER_TEST:
+            raise CommandError(f"--questions must be at least {QUESTIONS_PER_TEST}.")
+
+        self.session_keys = []
+        marker = uuid.uuid4().hex[:8]
+        category = TestCategory.objects.create(name=f"Submission benchmark {marker}")
+        candidate = User.objects.create_user(email=f"benchmark-{marker}@example.invalid", password=None)
+        try:
+            Question.objects.bulk_create(
+                Question(
+                    category=category, question_text=f"Question {i}?", option1="a", option2="b", option3="c",
+                    option4="d", correct_option=random.choice(["option1", "option2", "option3", "option4"]),
+                )
+                for i in range(options["questions"])
+            )
+            question_ids = list(category.questions.values_list("id", flat=True))
+            url = reverse("take_test", args=[category.id])
+
+            clients = [self.attempt(candidate, category, question_ids) for _ in range(options["submissions"] + 1)]
+            with inspect_queries() as inspector:
+                self.submit(clients.pop(), url, question_ids)
+
+            latencies, failures, wall = self.run(clients, url, question_ids, options["concurrency"])
+        finally:
+            Session.objects.filter(session_key__in=self.session_keys).delete()
+            # Questions, results, answers and their statistics cascade from these two rows.
+            category.delete()
+            candidate.delete()
+
+        ordered = sorted(latencies)
+        self.stdout.write(f"Database:        {connection.vendor}")
+        self.stdout.write(f"Submissions:     {options['submissions']} ({options['concurrency']} concurrent)")
+        self.stdout.write(f"Queries each:    {inspector.count} (excluding BEGIN/COMMIT)")
+        self.stdout.write(f"Failures:        {failures}")
+        self.stdout.write(f"Wall time:       {wall:.2f} s")
+        if ordered:
+            self.stdout.write(
+                f"Latency (ms):    mean {statistics.fmean(ordered):.1f}  p50 {percentile(ordered, 50):.1f}  "
+                f"p95 {percentile(ordered, 95):.1f}  p99 {percentile(ordered, 99):.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Throughput:      {len(ordered) / wall:.1f} submissions/sec"))
+
+    def attempt(self, candidate, category, question_ids):
+        """A logged-in client with a drawn attempt in its session, ready to submit."""
+        host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+        client = Client(HTTP_HOST=host, raise_request_exception=False)
+        client.force_login(candidate)
+        session = client.session
+        session[f"test_attempt_{category.id}"] = random.sample(question_ids, QUESTIONS_PER_TEST)
+        session.save()
+        self.session_keys.append(session.session_key)
+        return client
+
+    @staticmethod
+    def submit(client, url, question_ids):
+        answers = {str(pk): random.choice(["option1", "option2", "option3", "option4"]) for pk in question_ids}
+        response = client.post(url, answers)
+        return response.status_code == 302
+
+    def run(self, clients, url, question_ids, concurrency):
+        pending = queue.SimpleQueue()
+        for client in clients:
+            pending.put(client)
+        latencies, failures = [], []
+        barrier = threading.Barrier(concurrency + 1)
+
+        def work():
+            try:
+                barrier.wait()
+                while True:
+                    try:
+                        client = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    started = time.perf_counter()
+                    try:
+                        ok = self.submit(client, url, question_ids)
+                    except Exception:
+                        ok = False
+                    if ok:
+                        latencies.append((time.perf_counter() - started) * 1000)
+                    else:
+                        failures.append(client)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        return latencies, len(failures), time.perf_counter() - started
@@ -0,0 +1,214 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.urls import NoReverseMatch, reverse
+from django.utils import timezone
+
+import accounts.urls
+import application_tracking.urls
+from accounts.models import User
+from application_tracking.models import (
+    JobAdvert, JobApplication, Question, TestCategory, UserAnswer, UserTestResult,
+)
+from common.performance import percentile
+from common.queries import inspect_queries
+
+# Routes that change data on GET or only accept POST; benchmarking them is meaningless.
+SKIP = {"logout", "delete_advert", "decide", "bulk_decide", "admin_login_modal", "verify_account",
+        "verify_password_reset_link", "set_new_password"}
+ANONYMOUS = {"register", "reset_password_via_email", "candidate_login", "company_login"}
+ADMIN = {"listing_cache_stats", "edit_question", "delete_question"}
+COMPANY = {"create_advert", "my_jobs", "advert_applications", "update_advert", "export_cvs", "download_cv",
+           "company_home"}
+
+
+class Rollback(Exception):
+    pass
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every GET route of application_tracking and accounts with the test Client against the "
+        "current database (see generate_synthetic_data) and write a JSON report to compare across commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20, help="Timed requests per URL.")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per URL first.")
+        parser.add_argument("--only", nargs="*", default=(), help="Only these URL names.")
+        parser.add_argument("--output", default="benchmark-report.json")
+        parser.add_argument("--compare", help="An earlier report to print p50 changes against.")
+
+    def handle(self, *args, **options):
+        routes = []
+        for pattern in application_tracking.urls.urlpatterns + accounts.urls.urlpatterns:
+            if pattern.name and pattern.name not in SKIP and pattern.name not in dict(routes):
+                if not options["only"] or pattern.name in options["only"]:
+                    routes.append((pattern.name, list(pattern.pattern.converters)))
+
+        # Nothing a benchmarked view writes (sessions, attempts, ...) outlives the run.
+        results = {}
+        try:
+            with transaction.atomic():
+                clients = self.clients()
+                samples = self.sample_kwargs(clients)
+                for name, params in routes:
+                    results[name] = self.benchmark(name, params, samples, clients, options)
+                raise Rollback
+        except Rollback:
+            pass
+
+        commit, dirty = git_commit()
+        report = {
+            "meta": {
+                "commit": commit,
+                "dirty": dirty,
+                "created_at": timezone.now().isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "requests": options["requests"],
+                "warmup": options["warmup"],
+                "dataset": {
+                    model.__name__: model.objects.count()
+                    for model in (User, JobAdvert, JobApplication, TestCategory, Question, UserTestResult, UserAnswer)
+                },
+            },
+            "urls": results,
+        }
+        Path(options["output"]).write_text(json.dumps(report, indent=2) + "\n")
+        self.print_report(results, options["compare"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def clients(self):
+        host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+        candidate = (
+            User.objects.filter(role="candidate")
+            .annotate(results=Count("usertestresult")).order_by("-results").first()
+        )
+        company = (
+            User.objects.filter(role="company")
+            .annotate(adverts=Count("jobadvert")).order_by("-adverts").first()
+        )
+        users = {"candidate": candidate, "company": company, "admin": User.objects.filter(role="admin").first()}
+        if not candidate or not company:
+            raise CommandError("No candidate or company users; run generate_synthetic_data first.")
+
+        clients = {"anonymous": Client(HTTP_HOST=host, raise_request_exception=False)}
+        for role, user in users.items():
+            if user:
+                clients[role] = Client(HTTP_HOST=host, raise_request_exception=False)
+                clients[role].force_login(user)
+                clients[role].user = user
+        return clients
+
+    def sample_kwargs(self, clients):
+        candidate, company = clients["candidate"].user, clients["company"].user
+        advert = (
+            JobAdvert.objects.filter(created_by=company)
+            .annotate(applicants=Count("applications")).order_by("-applicants").first()
+        )
+        application = advert and advert.applications.first()
+        result = UserTestResult.objects.filter(user=candidate).order_by("-id").first()
+        category = TestCategory.objects.annotate(question_count=Count("questions")).order_by("-question_count").first()
+        question = Question.objects.first()
+        return {
+            "advert_id": advert and advert.id,
+            "job_application_id": application and application.id,
+            "category_id": category and category.id,
+            "result_id": result and result.id,
+            "question_id": question and question.id,
+            "dataset": "applications",
+        }
+
+    def benchmark(self, name, params, samples, clients, options):
+        role = (
+            "anonymous" if name in ANONYMOUS
+            else "company" if name in COMPANY
+            else "admin" if name in ADMIN or name.startswith("admin_")
+            else "candidate"
+        )
+        kwargs = {param: samples.get(param) for param in params}
+        if role not in clients or None in kwargs.values():
+            return {"skipped": f"no {role} user" if role not in clients else "no sample object"}
+        try:
+            path = reverse(name, kwargs=kwargs)
+        except NoReverseMatch:
+            return {"skipped": "cannot build URL"}
+        client = clients[role]
+
+        def fetch():
+            # The test Client closes the response itself, without the request_finished
+            # handler that would drop the connection (and the enclosing transaction).
+            response = client.get(path)
+            size = sum(len(chunk) for chunk in response.streaming_content) if response.streaming else len(response.content)
+            return response, size
+
+        for _ in range(options["warmup"]):
+            fetch()
+        latencies = []
+        for _ in range(options["requests"]):
+            with inspect_queries() as inspector:
+                started = time.perf_counter()
+                response, size = fetch()
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        ordered = sorted(latencies)
+        return {
+            "path": path,
+            "user": role,
+            "status": response.status_code,
+            "response_bytes": size,
+            "queries": inspector.count,
+            "latency_ms": {
+                "mean": round(statistics.fmean(ordered), 3),
+                "p50": round(percentile(ordered, 50), 3),
+                "p90": round(percentile(ordered, 90), 3),
+                "p99": round(percentile(ordered, 99), 3),
+                "min": round(ordered[0], 3),
+                "max": round(ordered[-1], 3),
+            },
+            "throughput_rps": round(len(ordered) / (sum(ordered) / 1000), 1),
+        }
+
+    def print_report(self, results, compare):
+        previous = {}
+        if compare:
+            previous = json.loads(Path(compare).read_text())["urls"]
+        for name, result in results.items():
+            if "skipped" in result:
+                self.stdout.write(f"{name:32} skipped: {result['skipped']}")
+                continue
+            line = (
+                f"{name:32} {result['status']}  p50 {result['latency_ms']['p50']:8.2f} ms  "
+                f"p90 {result['latency_ms']['p90']:8.2f} ms  {result['throughput_rps']:8.1f} req/s  "
+                f"{result['queries']:3} queries"
+            )
+            before = previous.get(name, {}).get("latency_ms", {}).get("p50")
+            if before:
+                line += f"  ({(result['latency_ms']['p50'] - before) / before:+.0%} p50)"
+            self.stdout.write(line)
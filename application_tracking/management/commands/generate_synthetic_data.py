@@ -0,0 +1,228 @@
+import math
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from accounts.models import User
+from application_tracking.caching import bump_listing_version
+from application_tracking.enums import ApplicationStatus, EmploymentType, ExperienceLevel, LocationTypeChoice
+from application_tracking.models import (
+    JobAdvert, JobApplication, Question, TestCategory, UserAnswer, UserTestResult,
+)
+from application_tracking.search import get_search_backend
+from application_tracking.stats import rebuild_stats
+from common.models import StoredBlob
+
+SYNTHETIC_DOMAIN = "synthetic.example"
+CATEGORY_PREFIX = "Synthetic "
+OPTIONS = ("option1", "option2", "option3", "option4")
+
+ROLES = ("Backend", "Frontend", "Data", "DevOps", "Mobile", "QA", "Security", "ML")
+TITLES = ("Engineer", "Developer", "Intern", "Analyst", "Architect")
+SKILLS = ("python", "django", "sql", "react", "docker", "aws", "kotlin", "rust", "go", "pandas", "linux")
+CITIES = ("Kolkata", "Bengaluru", "Pune", "Hyderabad", "Delhi", "Mumbai", "Chennai")
+SCALES = {
+    # candidates, companies, adverts per company, applications per advert, categories, questions per category, tests per candidate
+    "small": (200, 20, 5, 10, 4, 60, 2),
+    "medium": (5_000, 200, 10, 40, 8, 200, 3),
+    "large": (50_000, 1_000, 20, 100, 12, 500, 4),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with realistic synthetic users, adverts, applications, questions, "
+        f"test results and answers (bulk inserted). Synthetic users use @{SYNTHETIC_DOMAIN} emails."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES, default="small")
+        parser.add_argument("--candidates", type=int)
+        parser.add_argument("--companies", type=int)
+        parser.add_argument("--adverts-per-company", type=int)
+        parser.add_argument("--applications-per-advert", type=int)
+        parser.add_argument("--categories", type=int)
+        parser.add_argument("--questions-per-category", type=int)
+        parser.add_argument("--tests-per-candidate", type=int)
+        parser.add_argument("--questions-per-test", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--clear", action="store_true", help="Delete previously generated synthetic data first.")
+
+    def handle(self, *args, **options):
+        names = (
+            "candidates", "companies", "adverts_per_company", "applications_per_advert",
+            "categories", "questions_per_category", "tests_per_candidate",
+        )
+        sizes = {
+            name: default if options[name] is None else options[name]
+            for name, default in zip(names, SCALES[options["scale"]])
+        }
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+
+        if options["clear"]:
+            self.clear()
+        with transaction.atomic():
+            candidates, companies = self.create_users(sizes["candidates"], sizes["companies"])
+            adverts = self.create_adverts(companies, sizes["adverts_per_company"])
+            applications = self.create_applications(adverts, candidates, sizes["applications_per_advert"])
+            questions = self.create_questions(sizes["categories"], sizes["questions_per_category"])
+            results, answers = self.create_results(
+                candidates, questions, sizes["tests_per_candidate"], options["questions_per_test"]
+            )
+
+        # bulk_create skips signals, so bring the derived data up to date in one go.
+        get_search_backend().rebuild(JobAdvert.objects.all())
+        bump_listing_version()
+        rebuild_stats()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(candidates)} candidates, {len(companies)} companies, {len(adverts)} adverts, "
+            f"{applications} applications, {sum(len(q) for q in questions.values())} questions, "
+            f"{results} test results and {answers} answers."
+        ))
+
+    def clear(self):
+        with transaction.atomic():
+            UserTestResult.objects.filter(user__email__endswith=f"@{SYNTHETIC_DOMAIN}").delete()
+            JobApplication.objects.filter(email__endswith=f"@{SYNTHETIC_DOMAIN}").delete()
+            User.objects.filter(email__endswith=f"@{SYNTHETIC_DOMAIN}").delete()
+            TestCategory.objects.filter(name__startswith=CATEGORY_PREFIX).delete()
+        self.stdout.write("Removed earlier synthetic data.")
+
+    def create_users(self, candidates, companies):
+        # One hash for everyone: hashing per user would dominate the run time.
+        password = make_password("password")
+        run = timezone.now().strftime("%Y%m%d%H%M%S")
+        users = [
+            User(email=f"{role}{i}-{run}@{SYNTHETIC_DOMAIN}", password=password, role=role)
+            for role, count in (("candidate", candidates), ("company", companies))
+            for i in range(count)
+        ]
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        return users[:candidates], users[candidates:]
+
+    def create_adverts(self, companies, per_company):
+        today = timezone.now().date()
+        adverts = []
+        for company in companies:
+            company_name = f"{self.random.choice(ROLES)} Labs {company.email.split('@')[0]}"
+            for _ in range(per_company):
+                skills = self.random.sample(SKILLS, 3)
+                adverts.append(JobAdvert(
+                    title=f"{self.random.choice(ROLES)} {self.random.choice(TITLES)}",
+                    company_name=company_name,
+                    employment_type=self.random.choice(EmploymentType)[0],
+                    experience_level=self.random.choice(ExperienceLevel)[0],
+                    description=f"Work on {', '.join(skills)} with a small team. " * 5,
+                    job_type=self.random.choice(LocationTypeChoice)[0],
+                    location=self.random.choice(CITIES),
+                    is_published=self.random.random() < 0.9,
+                    # A fifth of the adverts are past their deadline.
+                    deadline=today + timedelta(days=self.random.randint(-30, 120)),
+                    skills=", ".join(skills),
+                    created_by=company,
+                ))
+        JobAdvert.objects.bulk_create(adverts, batch_size=self.batch_size)
+        return adverts
+
+    def create_applications(self, adverts, candidates, per_advert):
+        # Every application points at the same stored CV; the blob's reference count says so.
+        storage = storages["cvs"]
+        cv_name = storage.save("cvs/synthetic-cv.pdf", ContentFile(b"%PDF-1.4\n% synthetic CV\n"))
+        statuses = ApplicationStatus.values
+        count = 0
+        batch = []
+        for advert in adverts:
+            for candidate in self.random.sample(candidates, min(per_advert, len(candidates))):
+                batch.append(JobApplication(
+                    job_advert=advert,
+                    name=candidate.email.split("@")[0],
+                    email=candidate.email,
+                    portfolio_url=f"https://{SYNTHETIC_DOMAIN}/{candidate.email.split('@')[0]}",
+                    cv=cv_name,
+                    status=self.random.choices(statuses, weights=(70, 20, 10))[0],
+                ))
+            if len(batch) >= self.batch_size:
+                JobApplication.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        JobApplication.objects.bulk_create(batch)
+        count += len(batch)
+        StoredBlob.objects.filter(name=cv_name).update(ref_count=F("ref_count") + count - 1)
+        return count
+
+    def create_questions(self, categories, per_category):
+        existing = TestCategory.objects.filter(name__startswith=CATEGORY_PREFIX).count()
+        created = TestCategory.objects.bulk_create(
+            [TestCategory(name=f"{CATEGORY_PREFIX}{ROLES[i % len(ROLES)]} {existing + i}") for i in range(categories)]
+        )
+        questions = [
+            Question(
+                category=category,
+                question_text=f"{category.name}: question {i}?",
+                option1="Option A", option2="Option B", option3="Option C", option4="Option D",
+                correct_option=self.random.choice(OPTIONS),
+            )
+            for category in created
+            for i in range(per_category)
+        ]
+        Question.objects.bulk_create(questions, batch_size=self.batch_size)
+        by_category = {category.id: [] for category in created}
+        for question in questions:
+            by_category[question.category_id].append(question)
+        return by_category
+
+    def create_results(self, candidates, questions, per_candidate, per_test):
+        categories = [category_id for category_id, pool in questions.items() if pool]
+        if not categories:
+            return 0, 0
+        difficulty = {question.id: self.random.gauss(0, 1) for pool in questions.values() for question in pool}
+        result_count = answer_count = 0
+        results, pending_answers = [], []
+
+        def flush():
+            UserTestResult.objects.bulk_create(results, batch_size=self.batch_size)
+            for result, answers in zip(results, pending_answers):
+                for answer in answers:
+                    answer.test_result = result
+            UserAnswer.objects.bulk_create(
+                [answer for answers in pending_answers for answer in answers], batch_size=self.batch_size
+            )
+
+        for candidate in candidates:
+            ability = self.random.gauss(0, 1)
+            for _ in range(per_candidate):
+                category_id = self.random.choice(categories)
+                drawn = self.random.sample(questions[category_id], min(per_test, len(questions[category_id])))
+                answers = []
+                for question in drawn:
+                    # Rasch model: harder questions and weaker candidates answer correctly less often.
+                    is_correct = self.random.random() < 1 / (1 + math.exp(difficulty[question.id] - ability))
+                    wrong = [option for option in OPTIONS if option != question.correct_option]
+                    answers.append(UserAnswer(
+                        user=candidate,
+                        question=question,
+                        selected_option=question.correct_option if is_correct else self.random.choice(wrong),
+                        is_correct=is_correct,
+                    ))
+                results.append(UserTestResult(
+                    user=candidate, category_id=category_id, score=sum(a.is_correct for a in answers), total=len(drawn)
+                ))
+                pending_answers.append(answers)
+                answer_count += len(answers)
+            if len(results) >= self.batch_size:
+                result_count += len(results)
+                flush()
+                results, pending_answers = [], []
+        result_count += len(results)
+        flush()
+        return result_count, answer_count
@@ -0,0 +1,82 @@
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from application_tracking.models import JobApplication
+from common.models import StoredBlob
+
+CONTENT_ADDRESSED_NAME = re.compile(r"^cvs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$")
+
+
+class Command(BaseCommand):
+    help = (
+        "Move CVs stored under their upload name in MEDIA_ROOT into the content-addressed "
+        "CV storage, then recompute the blob reference counts from JobApplication rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report what would move without changing anything.")
+        parser.add_argument(
+            "--delete-originals", action="store_true",
+            help="Remove the old files once no application points at them.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        cv_storage = JobApplication._meta.get_field("cv").storage
+        legacy_storage = FileSystemStorage()
+
+        moved, missing, originals = 0, 0, set()
+        applications = JobApplication.objects.exclude(cv="").only("id", "cv").iterator(chunk_size=500)
+        for application in applications:
+            old_name = application.cv.name
+            if CONTENT_ADDRESSED_NAME.match(old_name):
+                continue
+            if not legacy_storage.exists(old_name):
+                missing += 1
+                self.stderr.write(f"Missing file for application {application.id}: {old_name}")
+                continue
+
+            if dry_run:
+                self.stdout.write(f"Would move {old_name}")
+            else:
+                with legacy_storage.open(old_name) as content:
+                    new_name = cv_storage.save(f"cvs/{os.path.basename(old_name)}", File(content))
+                JobApplication.objects.filter(pk=application.pk).update(cv=new_name)
+                originals.add(old_name)
+            moved += 1
+
+        if dry_run:
+            self.stdout.write(f"{moved} CV(s) would move, {missing} missing.")
+            return
+
+        recounted = self.recount_references()
+
+        removed = 0
+        if options["delete_originals"]:
+            still_used = set(JobApplication.objects.filter(cv__in=originals).values_list("cv", flat=True))
+            for name in originals - still_used:
+                legacy_storage.delete(name)
+                removed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Moved {moved} CV(s), {missing} missing, {recounted} blob(s) recounted, {removed} original(s) removed."
+        ))
+
+    def recount_references(self) -> int:
+        """Make StoredBlob.ref_count match the applications that actually point at each blob."""
+        counts = dict(
+            JobApplication.objects.exclude(cv="").values_list("cv").annotate(references=Count("id")).order_by()
+        )
+        cv_storage = JobApplication._meta.get_field("cv").storage
+        for name, references in counts.items():
+            if not CONTENT_ADDRESSED_NAME.match(name):
+                continue
+            size = cv_storage.size(name) if cv_storage.exists(name) else 0
+            StoredBlob.objects.update_or_create(name=name, defaults={"ref_count": references, "size": size})
+        StoredBlob.objects.exclude(name__in=counts.keys()).update(ref_count=0)
+        return len(counts)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from application_tracking.models import QuestionStats
+from application_tracking.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-category and per-question assessment statistics from all recorded results."
+
+    def handle(self, *args, **options):
+        categories = rebuild_stats()
+        questions = QuestionStats.objects.count()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt statistics for {categories} categories and {questions} questions."))
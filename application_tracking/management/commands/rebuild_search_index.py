@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from application_tracking.models import JobAdvert
+from application_tracking.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the JobAdvert full-text search index from scratch."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        total = backend.rebuild(JobAdvert.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} job adverts with {type(backend).__name__}."))
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+FTS_TABLE = "application_tracking_jobadvert_fts"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "advert_id UNINDEXED, title, company_name, description, skills, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} (advert_id, title, company_name, description, skills) "
+        "SELECT id, title, company_name, description, skills FROM application_tracking_jobadvert"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0004_alter_jobadvert_employment_type_useranswer'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:23
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0005_jobadvert_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobadvert',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-created_at', '-id'], name='jobadvert_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobadvert',
+            index=models.Index(fields=['created_by', '-created_at', '-id'], name='jobadvert_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['email', '-created_at', '-id'], name='jobapp_email_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job_advert', '-created_at', '-id'], name='jobapp_advert_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(django.db.models.functions.text.Lower('email'), models.F('job_advert'), name='jobapp_lower_email_advert_idx'),
+        ),
+    ]
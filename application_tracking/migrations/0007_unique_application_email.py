@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:23
+
+from collections import defaultdict
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def check_duplicate_applications(apps, schema_editor):
+    """
+    Stop before adding the constraint if an advert has several applications
+    from one address (ignoring case). Which one to keep depends on their
+    status and CVs, so they are listed for someone to resolve by hand; deleting
+    them here would also skip the signals that release each CV's stored blob.
+    """
+    JobApplication = apps.get_model('application_tracking', 'JobApplication')
+    groups = defaultdict(list)
+    rows = JobApplication.objects.order_by('created_at').values_list('id', 'job_advert_id', 'email', 'status')
+    for pk, job_advert_id, email, status in rows.iterator():
+        groups[job_advert_id, email.lower()].append(f'#{pk} ({status})')
+    duplicates = [
+        f'  advert {job_advert_id}, {email}: {", ".join(applications)}'
+        for (job_advert_id, email), applications in groups.items()
+        if len(applications) > 1
+    ]
+    if duplicates:
+        raise RuntimeError(
+            f'{len(duplicates)} advert/email pair(s) have more than one application. Keep one of each and delete '
+            f'the rest with JobApplication.objects.filter(pk__in=[...]).delete() in `manage.py shell`, which '
+            f'also releases their CVs, then run migrate again:\n'
+            + '\n'.join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0006_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_applications, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='jobapplication',
+            name='jobapp_lower_email_advert_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='jobapplication',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), models.F('job_advert'), name='jobapp_unique_email_per_advert'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:26
+
+import application_tracking.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0007_unique_application_email'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobapplication',
+            name='cv',
+            field=models.FileField(storage=application_tracking.uploads.select_cv_storage, upload_to='cvs/'),
+        ),
+    ]
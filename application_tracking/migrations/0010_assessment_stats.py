@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0008_alter_jobapplication_cv'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='application_tracking.testcategory')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.PositiveIntegerField(default=0)),
+                ('percentage_sum', models.FloatField(default=0)),
+                ('score_counts', models.JSONField(default=dict)),
+                ('histogram', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuestionStats',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='application_tracking.question')),
+                ('answered', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
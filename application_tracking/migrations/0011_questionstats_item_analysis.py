@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0010_assessment_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionstats',
+            name='analysed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='questionstats',
+            name='difficulty',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='questionstats',
+            name='discrimination',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='questionstats',
+            name='point_biserial',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
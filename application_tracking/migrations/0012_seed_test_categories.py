@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+DEFAULT_CATEGORIES = ["Math", "Aptitude", "English", "Coding"]
+
+
+def seed_categories(apps, schema_editor):
+    # Formerly done in AppConfig.ready() on every process start.
+    TestCategory = apps.get_model("application_tracking", "TestCategory")
+    for name in DEFAULT_CATEGORIES:
+        TestCategory.objects.get_or_create(name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0011_questionstats_item_analysis'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_categories, migrations.RunPython.noop),
+    ]
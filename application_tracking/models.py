@@ -1,8 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.urls import reverse
+from django.utils import timezone
 from common.models import BaseModel
+from common.tasks import send_mass_email
 from accounts.models import User
 from .enums import EmploymentType, ExperienceLevel, LocationTypeChoice, ApplicationStatus
+from .uploads import select_cv_storage
 from django.conf import settings
 
 
@@ -24,6 +28,16 @@ class JobAdvert(BaseModel):
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # Public listing: published adverts, newest first (keyset on created_at, id).
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(is_published=True),
+                name="jobadvert_published_idx",
+            ),
+            # my_jobs: a company's adverts, newest first.
+            models.Index(fields=["created_by", "-created_at", "-id"], name="jobadvert_owner_created_idx"),
+        ]
 
 
     def publish_advert(self) -> None:
@@ -37,14 +51,69 @@ class JobAdvert(BaseModel):
         return reverse("job_advert", kwargs={"advert_id": self.id})
 
 
+class JobApplicationQuerySet(models.QuerySet):
+
+    def update_status(self, status: str) -> int:
+        """
+        Move every application in the queryset to ``status`` with a single UPDATE.
+
+        Rows already in that status are left alone so nobody is notified twice.
+        Rejections are queued as one batch of outcome emails.
+        """
+        changed = self.exclude(status=status)
+        with transaction.atomic():
+            if status != ApplicationStatus.REJECTED:
+                return changed.update(status=status, updated_at=timezone.now())
+
+            # Read the recipients in the same transaction as the UPDATE, with the rows locked
+            # (SQLite already holds the write lock), so the emailed rows are the updated ones.
+            recipients = list(
+                changed.select_for_update(of=("self",)).values(
+                    "name", "email", "job_advert__title", "job_advert__company_name"
+                )
+            )
+            updated = changed.update(status=status, updated_at=timezone.now())
+            send_mass_email(
+                (
+                    (
+                        f"Application Outcome for {row['job_advert__title']}",
+                        [row["email"]],
+                        {
+                            "applicant_name": row["name"],
+                            "job_title": row["job_advert__title"],
+                            "company_name": row["job_advert__company_name"],
+                        },
+                    )
+                    for row in recipients
+                ),
+                "emails/job_application_update.html",
+            )
+        return updated
+
+
 class JobApplication(BaseModel):
     name=models.CharField(max_length= 50)
     email= models.EmailField()
     portfolio_url = models.URLField()
-    cv = models.FileField()
+    cv = models.FileField(upload_to="cvs/", storage=select_cv_storage)
     status= models.CharField(max_length= 20, choices=ApplicationStatus.choices,default=ApplicationStatus.APPLIED)
     job_advert= models.ForeignKey(JobAdvert, related_name= "applications", on_delete= models.CASCADE)
 
+    objects = JobApplicationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # my_applications: a candidate's applications, newest first.
+            models.Index(fields=["email", "-created_at", "-id"], name="jobapp_email_created_idx"),
+            # advert_applications: an advert's applicants, newest first.
+            models.Index(fields=["job_advert", "-created_at", "-id"], name="jobapp_advert_created_idx"),
+        ]
+        constraints = [
+            # One application per email and advert, case-insensitively. apply relies on
+            # the resulting IntegrityError instead of a racy exists() check.
+            models.UniqueConstraint(Lower("email"), "job_advert", name="jobapp_unique_email_per_advert"),
+        ]
+
 
 from django.db import models
 from django.contrib.auth.models import User
@@ -94,4 +163,90 @@ class UserAnswer(models.Model):
 
     def __str__(self):
         return f"{self.user.email} - {self.question.id} ({'Correct' if self.is_correct else 'Wrong'})"
-  
\ No newline at end of file
+  
+
+
+HISTOGRAM_BUCKETS = 10
+
+
+class CategoryStats(models.Model):
+    """
+    Running totals for a TestCategory, folded in as each attempt is saved
+    (see stats.record_test_result) so they are read without aggregating over
+    UserTestResult.
+
+    ``score_counts`` maps each raw score to how many attempts got it, which
+    is enough for an exact median; ``histogram`` counts attempts per 10%
+    band of the percentage score.
+    """
+    category = models.OneToOneField(TestCategory, primary_key=True, related_name="stats", on_delete=models.CASCADE)
+    attempts = models.PositiveIntegerField(default=0)
+    score_sum = models.PositiveIntegerField(default=0)
+    percentage_sum = models.FloatField(default=0)
+    score_counts = models.JSONField(default=dict)
+    histogram = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def add_result(self, score, total):
+        self.attempts += 1
+        self.score_sum += score
+        self.score_counts[str(score)] = self.score_counts.get(str(score), 0) + 1
+        if total:
+            if not self.histogram:
+                self.histogram = [0] * HISTOGRAM_BUCKETS
+            self.histogram[min(score * HISTOGRAM_BUCKETS // total, HISTOGRAM_BUCKETS - 1)] += 1
+            self.percentage_sum += score * 100 / total
+
+    @property
+    def mean_score(self):
+        return self.score_sum / self.attempts if self.attempts else None
+
+    @property
+    def mean_percentage(self):
+        graded = sum(self.histogram)
+        return self.percentage_sum / graded if graded else None
+
+    @property
+    def median_score(self):
+        if not self.attempts:
+            return None
+        counts = sorted((int(score), count) for score, count in self.score_counts.items())
+        # Scores at 0-based positions (n-1)//2 and n//2 of the sorted attempts.
+        wanted = [(self.attempts - 1) // 2, self.attempts // 2]
+        found, seen = [], 0
+        for score, count in counts:
+            seen += count
+            while wanted and wanted[0] < seen:
+                found.append(score)
+                wanted.pop(0)
+        return sum(found) / 2
+
+    @property
+    def histogram_bands(self):
+        """``(low, high, count)`` for each 10% band, for display."""
+        step = 100 // HISTOGRAM_BUCKETS
+        counts = self.histogram or [0] * HISTOGRAM_BUCKETS
+        return [(i * step, (i + 1) * step, count) for i, count in enumerate(counts)]
+
+    def __str__(self):
+        return f"{self.category} stats ({self.attempts} attempts)"
+
+
+class QuestionStats(models.Model):
+    """How often a Question is answered and answered correctly, kept current by stats.record_test_result."""
+    question = models.OneToOneField(Question, primary_key=True, related_name="stats", on_delete=models.CASCADE)
+    answered = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    # Item analysis over all answers, written by the analyse_items command.
+    difficulty = models.FloatField(null=True, blank=True)
+    discrimination = models.FloatField(null=True, blank=True)
+    point_biserial = models.FloatField(null=True, blank=True)
+    analysed_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def correct_rate(self):
+        return self.correct / self.answered if self.answered else None
+
+    def __str__(self):
+        return f"Question {self.question_id}: {self.correct}/{self.answered} correct"
+
@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.utils.module_loading import import_string
+
+
+FTS_TABLE = "application_tracking_jobadvert_fts"
+INDEXED_FIELDS = ("title", "company_name", "description", "skills")
+
+
+class BaseSearchBackend:
+    """Interface every JobAdvert search backend implements."""
+
+    def filter(self, queryset: QuerySet, keyword: str) -> QuerySet:
+        """Restrict ``queryset`` to adverts matching ``keyword``, best match first."""
+        raise NotImplementedError
+
+    def update(self, advert) -> None:
+        """Add or refresh a single advert in the index."""
+
+    def remove(self, advert_id) -> None:
+        """Drop a single advert from the index."""
+
+    def rebuild(self, queryset: QuerySet) -> int:
+        """Re-index every advert in ``queryset`` and return how many were indexed."""
+        return 0
+
+
+class IcontainsSearchBackend(BaseSearchBackend):
+    """Fallback for databases without a full-text index: a LIKE scan over the text columns."""
+
+    def filter(self, queryset, keyword):
+        query = Q()
+        for field in INDEXED_FIELDS:
+            query |= Q(**{f"{field}__icontains": keyword})
+        return queryset.filter(query)
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """Inverted index kept in an FTS5 virtual table, ranked with bm25()."""
+
+    def filter(self, queryset, keyword):
+        match = self.build_match_query(keyword)
+        if not match:
+            return queryset
+
+        table = queryset.model._meta.db_table
+        # A join, not an id__in subquery, so bm25() is computed once per match rather than
+        # by a correlated subquery per row; Django only joins a raw table through extra().
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.advert_id = {table}.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+            select={"search_rank": f"bm25({FTS_TABLE})"},
+        ).order_by("search_rank", "-created_at")
+
+    def update(self, advert):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE advert_id = %s", [advert.id.hex])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (advert_id, {', '.join(INDEXED_FIELDS)}) VALUES (%s, %s, %s, %s, %s)",
+                [advert.id.hex] + [getattr(advert, field) or "" for field in INDEXED_FIELDS],
+            )
+
+    def remove(self, advert_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE advert_id = %s", [advert_id.hex])
+
+    def rebuild(self, queryset, chunk_size=2000):
+        total = 0
+        rows = queryset.values_list("id", *INDEXED_FIELDS).iterator(chunk_size=chunk_size)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            batch = []
+            for advert_id, *fields in rows:
+                batch.append([advert_id.hex] + [value or "" for value in fields])
+                if len(batch) >= chunk_size:
+                    total += self._insert_many(cursor, batch)
+                    batch = []
+            total += self._insert_many(cursor, batch)
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        return total
+
+    def _insert_many(self, cursor, batch):
+        if batch:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (advert_id, {', '.join(INDEXED_FIELDS)}) VALUES (%s, %s, %s, %s, %s)",
+                batch,
+            )
+        return len(batch)
+
+    @staticmethod
+    def build_match_query(keyword: str) -> str:
+        """Turn free text into an FTS5 query: every word must match, as a prefix."""
+        terms = []
+        for word in keyword.split():
+            word = word.replace('"', '""')
+            terms.append(f'"{word}"*')
+        return " ".join(terms)
+
+
+_backend = None
+
+
+def get_search_backend() -> BaseSearchBackend:
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, "JOB_SEARCH_BACKEND", None)
+        if backend_path:
+            _backend = import_string(backend_path)()
+        elif connection.vendor == "sqlite":
+            _backend = SQLiteFTSBackend()
+        else:
+            _backend = IcontainsSearchBackend()
+    return _backend
@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import bump_listing_version, bump_owner_listing_version, invalidate_question
+from .models import JobAdvert, JobApplication, Question
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=JobAdvert)
+def job_advert_saved(sender, instance: JobAdvert, **kwargs):
+    get_search_backend().update(instance)
+    bump_listing_version()
+
+
+@receiver(post_delete, sender=JobAdvert)
+def job_advert_deleted(sender, instance: JobAdvert, **kwargs):
+    get_search_backend().remove(instance.id)
+    bump_listing_version()
+
+
+@receiver(pre_save, sender=Question)
+def remember_question_category(sender, instance: Question, **kwargs):
+    # An edit can move a question to another category; both pools must be dropped.
+    instance._previous_category_id = None
+    if instance.pk:
+        instance._previous_category_id = (
+            Question.objects.filter(pk=instance.pk).values_list("category_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Question)
+def invalidate_saved_question(sender, instance: Question, **kwargs):
+    category_ids = {instance.category_id, getattr(instance, "_previous_category_id", None)} - {None}
+    invalidate_question(instance.pk, *category_ids)
+
+
+@receiver(post_delete, sender=Question)
+def invalidate_deleted_question(sender, instance: Question, **kwargs):
+    invalidate_question(instance.pk, instance.category_id)
+
+
+@receiver(post_delete, sender=JobApplication)
+def release_application_cv(sender, instance: JobApplication, **kwargs):
+    if instance.cv:
+        instance.cv.delete(save=False)
+
+
+def _bump_advert_owner(advert_id):
+    owner_id = JobAdvert.objects.filter(pk=advert_id).values_list("created_by_id", flat=True).first()
+    if owner_id:
+        bump_owner_listing_version(owner_id)
+
+
+@receiver(post_save, sender=JobApplication)
+def application_saved(sender, instance: JobApplication, created, **kwargs):
+    # Only a new application changes the applicant counts on company_home.
+    if created:
+        _bump_advert_owner(instance.job_advert_id)
+
+
+@receiver(post_delete, sender=JobApplication)
+def application_deleted(sender, instance: JobApplication, **kwargs):
+    _bump_advert_owner(instance.job_advert_id)
@@ -0,0 +1,55 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import CategoryStats, QuestionStats, UserAnswer, UserTestResult
+
+
+def record_test_result(test_result, answers):
+    """
+    Fold one saved attempt and its answers into CategoryStats and
+    QuestionStats, in a short transaction of its own. take_test runs it once
+    the attempt has committed, so the CategoryStats row lock is never held
+    while a submission writes its attempt; should the process die in between,
+    rebuild_stats recomputes the totals from the attempts.
+    """
+    answered = [answer.question_id for answer in answers]
+    correct = [answer.question_id for answer in answers if answer.is_correct]
+    with transaction.atomic():
+        stats, _ = CategoryStats.objects.select_for_update().get_or_create(category_id=test_result.category_id)
+        stats.add_result(test_result.score, test_result.total)
+        stats.save()
+
+        if not answered:
+            return
+        QuestionStats.objects.bulk_create([QuestionStats(question_id=pk) for pk in answered], ignore_conflicts=True)
+        QuestionStats.objects.filter(pk__in=answered).update(answered=F("answered") + 1)
+        if correct:
+            QuestionStats.objects.filter(pk__in=correct).update(correct=F("correct") + 1)
+
+
+def rebuild_stats():
+    """Recompute every CategoryStats and QuestionStats row from the recorded results and answers."""
+    categories = defaultdict(lambda: CategoryStats())
+    results = UserTestResult.objects.values_list("category_id", "score", "total").order_by()
+    for category_id, score, total in results.iterator(chunk_size=2000):
+        stats = categories[category_id]
+        stats.category_id = category_id
+        stats.add_result(score, total)
+
+    questions = (
+        UserAnswer.objects.values("question_id")
+        .annotate(answered=Count("id"), correct=Count("id", filter=Q(is_correct=True)))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        CategoryStats.objects.all().delete()
+        QuestionStats.objects.all().delete()
+        CategoryStats.objects.bulk_create(categories.values())
+        QuestionStats.objects.bulk_create(
+            QuestionStats(question_id=row["question_id"], answered=row["answered"], correct=row["correct"])
+            for row in questions
+        )
+    return len(categories)
@@ -1,3 +1,1042 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import tempfile
+import threading
+from importlib import import_module
+import warnings
+import zipfile
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+from django.apps import apps
+from django.conf import global_settings, settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache, caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Lower
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from common.models import EmailJob, StoredBlob
+from common.queries import QueryBaseline, inspect_queries, normalize_sql
+from common.testing import QueryCountMixin, create_advert, create_application, create_company, create_question
+from .caching import (
+    LISTING_VERSION_KEY, get_cached_listing, get_question_pool_ids, get_questions, listing_cache_stats, listing_key,
+    question_key, set_cached_listing,
+)
+from .checks import check_shared_cache
+from .enums import ApplicationStatus
+from .models import (
+    CategoryStats, JobAdvert, JobApplication, Question, QuestionStats, TestCategory, UserAnswer, UserTestResult,
+)
+from .search import FTS_TABLE, IcontainsSearchBackend, SQLiteFTSBackend, get_search_backend
+from .stats import rebuild_stats, record_test_result
+from .views import QUESTIONS_PER_TEST
+
+try:
+    import numpy as np
+    from .item_analysis import ItemAnalysis, group_cutoffs
+except ImportError:
+    np = None
+
+
+@skipUnless(connection.vendor == "sqlite", "Query plans are asserted against SQLite")
+class QueryPlanTests(TestCase):
+    """The hot listing and lookup queries must be served by an index, not a table scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        cls.advert = create_advert(cls.company)
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(f"INDEX {index_name}", plan)
+        self.assertNotIn("TEMP B-TREE FOR ORDER BY", plan)
+
+    def test_published_listing(self):
+        active_jobs = JobAdvert.objects.filter(is_published=True, deadline__gte=timezone.now().date())
+        self.assertUsesIndex(active_jobs.order_by("-created_at", "-id")[:11], "jobadvert_published_idx")
+
+    def test_my_jobs(self):
+        jobs = JobAdvert.objects.filter(created_by=self.company).order_by("-created_at", "-id")[:11]
+        self.assertUsesIndex(jobs, "jobadvert_owner_created_idx")
+        annotated = JobAdvert.objects.filter(created_by=self.company).annotate(total_applicants=Count("applications"))
+        self.assertIn("INDEX jobadvert_owner_created_idx", annotated.explain())
+
+    def test_my_applications(self):
+        applications = JobApplication.objects.filter(email="candidate@example.com")
+        self.assertUsesIndex(applications.order_by("-created_at", "-id")[:11], "jobapp_email_created_idx")
+
+    def test_advert_applications(self):
+        applications = self.advert.applications.order_by("-created_at", "-id")[:11]
+        self.assertUsesIndex(applications, "jobapp_advert_created_idx")
+
+    def test_duplicate_application_check(self):
+        duplicates = self.advert.applications.alias(email_lower=Lower("email")).filter(
+            email_lower="candidate@example.com"
+        )
+        self.assertUsesIndex(duplicates, "jobapp_unique_email_per_advert")
+
+
+@skipUnless(connection.vendor == "sqlite", "The FTS5 index only exists on SQLite")
+class SearchIndexTests(TestCase):
+
+    def setUp(self):
+        self.company = create_company()
+        self.backend = SQLiteFTSBackend()
+
+    def search(self, keyword):
+        return list(self.backend.filter(JobAdvert.objects.all(), keyword))
+
+    def test_index_follows_save_update_and_delete(self):
+        advert = create_advert(self.company, title="Cobol Developer")
+        self.assertEqual(self.search("cobol"), [advert])
+
+        advert.title = "Rust Developer"
+        advert.save()
+        self.assertEqual(self.search("cobol"), [])
+        self.assertEqual(self.search("rus"), [advert])
+
+        advert.delete()
+        self.assertEqual(self.search("rust"), [])
+
+    def test_best_match_first(self):
+        passing = create_advert(self.company, title="Backend Engineer", skills="go, python")
+        focused = create_advert(
+            self.company, title="Python Developer", description="Python services, python tooling.", skills="python"
+        )
+        create_advert(self.company, title="Rust Developer", description="Systems work.", skills="rust")
+
+        self.assertEqual(self.search("python"), [focused, passing])
+        self.assertEqual(self.search("python backend"), [passing])
+
+    @override_settings(JOB_SEARCH_BACKEND=None)
+    @mock.patch("application_tracking.search._backend", None)
+    def test_backend_follows_database(self):
+        self.assertIsInstance(get_search_backend(), SQLiteFTSBackend)
+
+    @override_settings(JOB_SEARCH_BACKEND=None)
+    @mock.patch("application_tracking.search._backend", None)
+    @mock.patch("application_tracking.search.connection", SimpleNamespace(vendor="postgresql"))
+    def test_other_databases_fall_back_to_icontains(self):
+        self.assertIsInstance(get_search_backend(), IcontainsSearchBackend)
+
+    def test_rebuild_search_index(self):
+        advert = create_advert(self.company, title="Cobol Developer")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        self.assertEqual(self.search("cobol"), [])
+
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("Indexed 1 job adverts", out.getvalue())
+        self.assertEqual(self.search("cobol"), [advert])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ApplyTests(TransactionTestCase):
+
+    def setUp(self):
+        self.advert = create_advert(create_company())
+        self.url = reverse("apply_for_job", kwargs={"advert_id": self.advert.id})
+
+    def submit(self, email="candidate@example.com"):
+        return Client().post(self.url, {
+            "name": "Candidate",
+            "email": email,
+            "portfolio_url": "https://example.com",
+            "cv": SimpleUploadedFile("cv.pdf", b"%PDF-1.4 cv", content_type="application/pdf"),
+        })
+
+    def test_duplicate_is_case_insensitive(self):
+        self.submit("candidate@example.com")
+        response = self.submit("Candidate@Example.com")
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.advert.applications.count(), 1)
+
+    @override_settings(MAX_UPLOAD_SIZE=8)
+    def test_oversized_cv_is_refused(self):
+        response = self.submit()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            "File is too large. The maximum size is 8\xa0bytes.", response.context["application_form"].errors["cv"]
+        )
+        self.assertFalse(self.advert.applications.exists())
+        self.assertFalse(StoredBlob.objects.exists())
+
+    def test_cv_digest_comes_from_the_upload_handler(self):
+        with mock.patch("common.storage.hashlib") as storage_hashlib:
+            response = self.submit()
+
+        storage_hashlib.sha256.assert_not_called()
+        self.assertEqual(response.status_code, 302)
+        application = self.advert.applications.get()
+        self.assertEqual(application.cv.read(), b"%PDF-1.4 cv")
+        self.assertEqual(StoredBlob.objects.get().ref_count, 1)
+
+    def test_csrf_is_still_checked(self):
+        response = Client(enforce_csrf_checks=True).post(self.url, {"name": "Candidate"})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(self.advert.applications.exists())
+
+    def test_upload_handlers_are_only_changed_for_apply(self):
+        self.assertEqual(settings.FILE_UPLOAD_HANDLERS, global_settings.FILE_UPLOAD_HANDLERS)
+
+    def test_concurrent_submissions_create_one_application(self):
+        attempts = 8
+        barrier = threading.Barrier(attempts)
+        responses, errors = [], []
+
+        def submit():
+            try:
+                barrier.wait()
+                responses.append(self.submit())
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=submit) for _ in range(attempts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertTrue(all(response.status_code == 302 for response in responses))
+        self.assertEqual(self.advert.applications.count(), 1)
+
+
+class UpdateStatusTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.advert = create_advert(create_company())
+        for email in ("first@example.com", "second@example.com", "rejected@example.com"):
+            create_application(cls.advert, email=email)
+        cls.advert.applications.filter(email="rejected@example.com").update(status=ApplicationStatus.REJECTED)
+
+    def test_rejection_updates_once_and_emails_each_changed_row(self):
+        with CaptureQueriesContext(connection) as queries:
+            updated = self.advert.applications.update_status(ApplicationStatus.REJECTED)
+
+        self.assertEqual(updated, 2)
+        table = JobApplication._meta.db_table
+        self.assertEqual(len([query for query in queries if query["sql"].startswith(f'UPDATE "{table}"')]), 1)
+        self.assertCountEqual(
+            EmailJob.objects.values_list("to", flat=True), [["first@example.com"], ["second@example.com"]]
+        )
+
+        self.assertEqual(self.advert.applications.update_status(ApplicationStatus.REJECTED), 0)
+        self.assertEqual(EmailJob.objects.count(), 2)
+
+    def test_other_statuses_send_nothing(self):
+        self.assertEqual(self.advert.applications.update_status(ApplicationStatus.INTERVIEW), 3)
+        self.assertFalse(EmailJob.objects.exists())
+
+
+class AssessmentStatsTests(TestCase):
+
+    def stats_for(self, *results):
+        stats = CategoryStats()
+        for score, total in results:
+            stats.add_result(score, total)
+        return stats
+
+    def test_median(self):
+        self.assertIsNone(CategoryStats().median_score)
+        self.assertEqual(self.stats_for((3, 5), (1, 5), (2, 5)).median_score, 2)
+        self.assertEqual(self.stats_for((3, 5), (1, 5), (2, 5), (4, 5)).median_score, 2.5)
+        self.assertEqual(self.stats_for((5, 5), (5, 5), (0, 5), (5, 5)).median_score, 5)
+
+    def test_histogram_bands(self):
+        stats = self.stats_for((10, 10), (9, 10), (0, 10), (5, 10), (20, 20), (0, 0))
+
+        self.assertEqual(stats.histogram, [1, 0, 0, 0, 0, 1, 0, 0, 0, 3])
+        self.assertEqual(stats.histogram_bands[-1], (90, 100, 3))
+        self.assertEqual(stats.attempts, 6)
+        # The ungraded (0/0) attempt counts as an attempt but not towards the percentage.
+        self.assertAlmostEqual(stats.mean_percentage, (100 + 90 + 0 + 50 + 100) / 5)
+
+    def test_recorded_stats_match_a_rebuild(self):
+        category = TestCategory.objects.create(name="Python")
+        questions = [create_question(category) for _ in range(4)]
+        for i, correct in enumerate(([0, 1, 2], [0], [], [0, 1, 2, 3])):
+            candidate = User.objects.create_user(email=f"candidate{i}@example.com", password="password")
+            with transaction.atomic():
+                result = UserTestResult.objects.create(
+                    user=candidate, category=category, score=len(correct), total=len(questions)
+                )
+                answers = UserAnswer.objects.bulk_create(
+                    UserAnswer(
+                        user=candidate, question=question, test_result=result,
+                        selected_option="option1" if index in correct else "option2", is_correct=index in correct,
+                    )
+                    for index, question in enumerate(questions[:3] if i == 1 else questions)
+                )
+                record_test_result(result, answers)
+
+        def snapshot():
+            category_stats = CategoryStats.objects.get(category=category)
+            return (
+                (category_stats.attempts, category_stats.score_sum, category_stats.score_counts,
+                 category_stats.histogram, round(category_stats.percentage_sum, 6)),
+                list(QuestionStats.objects.order_by("question_id").values_list("question_id", "answered", "correct")),
+            )
+
+        recorded = snapshot()
+        self.assertEqual(recorded[1], [
+            (questions[0].id, 4, 3), (questions[1].id, 4, 2), (questions[2].id, 4, 2), (questions[3].id, 3, 1),
+        ])
+        self.assertEqual(CategoryStats.objects.get(category=category).median_score, 2)
+        rebuild_stats()
+        self.assertEqual(snapshot(), recorded)
+
+
+# Four attempts at a three-question test, ranked A > B > C > D, as correct/incorrect per question.
+ITEM_RESPONSES = {"A": [1, 1, 1], "B": [1, 1, 0], "C": [1, 0, 0], "D": [0, 0, 0]}
+
+
+@skipUnless(np is not None, "Item analysis needs NumPy")
+class ItemAnalysisTests(TestCase):
+    # Percentages 1, 2/3, 1/3 and 0 put the 27%/73% quantiles at 0.27 and 0.73,
+    # so A alone is the upper group and D alone the lower group: every question
+    # discriminates by 1 - 0. Difficulty is the column mean. The point-biserial
+    # correlates each column with the rest score (score - x) / 2: question 1 has
+    # rest [1, .5, 0, 0], giving .09375 / sqrt(.1875 * .171875) = .52223;
+    # question 2 has rest [1, .5, .5, 0], giving .125 / sqrt(.25 * .125) = 1 / sqrt(2);
+    # question 3 mirrors question 1.
+    EXPECTED = [(4, 3, 0.75, 1.0, 0.52223), (4, 2, 0.5, 1.0, 0.70711), (4, 1, 0.25, 1.0, 0.52223)]
+
+    def assertResults(self, results, question_ids):
+        self.assertEqual(sorted(results), sorted(question_ids))
+        for question_id, (answered, correct, difficulty, discrimination, point_biserial) in zip(
+            question_ids, self.EXPECTED
+        ):
+            got = results[question_id]
+            self.assertEqual(got[:2], (answered, correct))
+            self.assertAlmostEqual(got[2], difficulty)
+            self.assertAlmostEqual(got[3], discrimination)
+            self.assertAlmostEqual(got[4], point_biserial, places=5)
+
+    def test_group_cutoffs(self):
+        categories = np.array([1, 1, 1, 1, 2, 2, 1])
+        scores = np.array([0, 1, 2, 3, 5, 5, 0])
+        totals = np.array([4, 4, 4, 4, 10, 10, 0])
+
+        lower, upper = group_cutoffs(categories, scores, totals)
+
+        # Category 1 percentages [0, .25, .5, .75]: 0.27 * 3 = 0.81 of the way into the
+        # first gap and 0.73 * 3 = 2.19 into the third. The 0/0 attempt is ignored and
+        # category 0 has no attempts at all.
+        np.testing.assert_allclose(lower, [np.nan, 0.2025, 0.5])
+        np.testing.assert_allclose(upper, [np.nan, 0.5475, 0.5])
+
+    def test_statistics_from_chunks(self):
+        responses = np.array(list(ITEM_RESPONSES.values()))
+        scores = responses.sum(axis=1)
+        lower, upper = group_cutoffs(np.ones(4, dtype=np.int64), scores, np.full(4, 3))
+        analysis = ItemAnalysis(lower, upper)
+        columns = (
+            np.tile([0, 1, 2], 4), responses.ravel(), np.repeat(scores, 3), np.full(12, 3), np.ones(12, dtype=np.int64),
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            for part in (slice(0, 5), slice(5, 12)):
+                analysis.add(*(column[part] for column in columns))
+            # An ungraded attempt (0/0) belongs to neither group and must not warn.
+            analysis.add(*(np.array([value]) for value in (5, 0, 0, 0, 1)))
+            results = analysis.results()
+
+        self.assertEqual(results.pop(5), (1, 0, 0.0, None, None))
+        self.assertResults(results, [0, 1, 2])
+
+    def create_attempts(self):
+        category = TestCategory.objects.create(name="Python")
+        questions = [create_question(category) for _ in range(3)]
+        for name, response in ITEM_RESPONSES.items():
+            candidate = User.objects.create_user(email=f"{name.lower()}@example.com", password="password")
+            result = UserTestResult.objects.create(user=candidate, category=category, score=sum(response), total=3)
+            UserAnswer.objects.bulk_create(
+                UserAnswer(user=candidate, question=question, test_result=result, is_correct=bool(correct))
+                for question, correct in zip(questions, response)
+            )
+        return [question.id for question in questions]
+
+    def test_analyse_items_writes_question_stats(self):
+        question_ids = self.create_attempts()
+        out = StringIO()
+
+        call_command("analyse_items", "--chunk-size", "2", stdout=out)
+
+        self.assertIn("Analysed 12 answers over 3 questions", out.getvalue())
+        rows = QuestionStats.objects.in_bulk(question_ids)
+        self.assertResults(
+            {pk: (s.answered, s.correct, s.difficulty, s.discrimination, s.point_biserial) for pk, s in rows.items()},
+            question_ids,
+        )
+        self.assertTrue(all(stats.analysed_at for stats in rows.values()))
+
+    def test_analyse_items_keeps_live_counters(self):
+        question_ids = self.create_attempts()
+        QuestionStats.objects.create(question_id=question_ids[0], answered=10, correct=7)
+
+        call_command("analyse_items", stdout=StringIO())
+
+        stats = QuestionStats.objects.get(question_id=question_ids[0])
+        self.assertEqual((stats.answered, stats.correct), (10, 7))
+        self.assertAlmostEqual(stats.difficulty, 0.75)
+
+    def test_benchmark_reads_the_database(self):
+        with self.assertRaisesMessage(CommandError, "no answers in the database"):
+            call_command("benchmark_item_analysis", stdout=StringIO())
+        self.create_attempts()
+        out = StringIO()
+
+        call_command("benchmark_item_analysis", "--chunk-size", "5", stdout=out)
+
+        self.assertIn(f"Read 12 answers (4 attempts) from {connection.vendor} into NumPy", out.getvalue())
+        self.assertIn("Analysed 12 answers over 3 questions", out.getvalue())
+
+    def test_benchmark_in_memory(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_item_analysis", "--in-memory", "--answers", "2000", "--questions", "40",
+            "--categories", "2", "--questions-per-test", "10", "--chunk-size", "500", stdout=out,
+        )
+
+        self.assertIn("Generated 2,000 answers (200 attempts)", out.getvalue())
+        self.assertIn("Analysed 2,000 answers over", out.getvalue())
+        self.assertFalse(UserAnswer.objects.exists())
+
+
+class BulkDecideTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        cls.advert = create_advert(cls.company)
+        cls.applied = create_application(cls.advert, email="applied@example.com")
+        cls.interview = create_application(cls.advert, email="interview@example.com")
+        JobApplication.objects.filter(pk=cls.interview.pk).update(status=ApplicationStatus.INTERVIEW)
+        cls.other_advert = create_application(create_advert(cls.company), email="other@example.com")
+        cls.url = reverse("bulk_decide", args=[cls.advert.id])
+
+    def setUp(self):
+        self.client.force_login(self.company)
+
+    def post_json(self, payload):
+        return self.client.post(self.url, json.dumps(payload), content_type="application/json")
+
+    def test_only_the_advert_owner_may_decide(self):
+        self.client.force_login(create_company("intruder@example.com"))
+        response = self.post_json({"application_ids": [str(self.applied.id)], "status": ApplicationStatus.REJECTED})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(JobApplication.objects.get(pk=self.applied.pk).status, ApplicationStatus.APPLIED)
+
+    def test_json_reports_each_application(self):
+        ids = [str(self.applied.id), str(self.interview.id), str(self.other_advert.id), "not-a-uuid"]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_json({"application_ids": ids, "status": ApplicationStatus.INTERVIEW})
+
+        self.assertEqual(response.json(), {
+            "status": "INTERVIEW",
+            "updated": 1,
+            "results": {ids[0]: "updated", ids[1]: "unchanged", ids[2]: "not_found", ids[3]: "not_found"},
+        })
+        table = JobApplication._meta.db_table
+        updates = [query for query in queries if query["sql"].startswith(f'UPDATE "{table}"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(JobApplication.objects.get(pk=self.applied.pk).status, ApplicationStatus.INTERVIEW)
+        self.assertEqual(JobApplication.objects.get(pk=self.other_advert.pk).status, ApplicationStatus.APPLIED)
+
+    def test_invalid_json_bodies(self):
+        for body in ("{", "[]", '"x"', "1"):
+            with self.subTest(body):
+                response = self.client.post(self.url, body, content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+        response = self.post_json({"application_ids": "not-a-list", "status": ApplicationStatus.REJECTED})
+        self.assertEqual(response.status_code, 400)
+        response = self.post_json({"application_ids": [str(self.applied.id)], "status": "HIRED"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_form_post(self):
+        response = self.client.post(
+            self.url, {"application_ids": [self.applied.id, self.interview.id], "status": ApplicationStatus.REJECTED}
+        )
+        self.assertRedirects(
+            response, reverse("advert_applications", args=[self.advert.id]), fetch_redirect_response=False
+        )
+        self.assertEqual(
+            set(self.advert.applications.values_list("status", flat=True)), {ApplicationStatus.REJECTED}
+        )
+        self.assertEqual(EmailJob.objects.count(), 2)
+
+
+class QuestionCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = TestCategory.objects.create(name="Python")
+        cls.other_category = TestCategory.objects.create(name="Django")
+        cls.questions = [create_question(cls.category) for _ in range(3)]
+        cls.ids = [question.id for question in cls.questions]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pool_is_cached(self):
+        self.assertCountEqual(get_question_pool_ids(self.category.id), self.ids)
+        with self.assertNumQueries(0):
+            self.assertCountEqual(get_question_pool_ids(self.category.id), self.ids)
+
+    def test_payloads_are_cached_in_order(self):
+        ids = self.ids[::-1]
+        with self.assertNumQueries(1):
+            payloads = get_questions(self.category.id, ids)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_questions(self.category.id, ids), payloads)
+        self.assertEqual([payload["id"] for payload in payloads], ids)
+        self.assertNotIn("correct_option", payloads[0])
+
+    def test_added_question_joins_the_pool(self):
+        get_question_pool_ids(self.category.id)
+        question = create_question(self.category)
+        self.assertIn(question.id, get_question_pool_ids(self.category.id))
+
+    def test_edited_question_is_refetched(self):
+        get_questions(self.category.id, self.ids)
+        question = self.questions[0]
+        question.question_text = "Edited?"
+        question.save()
+        self.assertEqual(get_questions(self.category.id, self.ids)[0]["question_text"], "Edited?")
+
+    def test_deleted_question_is_dropped(self):
+        get_question_pool_ids(self.category.id)
+        get_questions(self.category.id, self.ids)
+        deleted_id = self.ids[0]
+        self.questions[0].delete()
+        self.assertNotIn(deleted_id, get_question_pool_ids(self.category.id))
+        self.assertEqual([payload["id"] for payload in get_questions(self.category.id, self.ids)], self.ids[1:])
+
+    def test_moved_question_changes_pools(self):
+        get_question_pool_ids(self.category.id)
+        get_question_pool_ids(self.other_category.id)
+        get_questions(self.category.id, self.ids)
+        question = self.questions[0]
+        question.category = self.other_category
+        question.save()
+
+        self.assertNotIn(question.id, get_question_pool_ids(self.category.id))
+        self.assertEqual(get_question_pool_ids(self.other_category.id), [question.id])
+        self.assertEqual(get_questions(self.category.id, [question.id]), [])
+
+    def test_invalidation_reaches_other_workers(self):
+        # What another worker process sees: its own connection to the configured cache.
+        other_worker = caches.create_connection("default")
+        get_questions(self.category.id, self.ids)
+        self.assertEqual(other_worker.get(question_key(self.ids[0]))["id"], self.ids[0])
+
+        self.questions[0].save()
+
+        self.assertIsNone(other_worker.get(question_key(self.ids[0])))
+
+    def test_per_process_cache_is_flagged(self):
+        self.assertEqual(check_shared_cache(None), [])
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            self.assertEqual([warning.id for warning in check_shared_cache(None)], ["application_tracking.W001"])
+
+
+class ListingCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        # What another worker process sees: its own connection to the configured cache.
+        self.other_worker = caches.create_connection("default")
+
+    def test_advert_change_moves_every_workers_listing_version(self):
+        advert = create_advert(create_company())
+        key = listing_key("page", "", "")
+        version = self.other_worker.get(LISTING_VERSION_KEY)
+
+        advert.title = "Renamed"
+        advert.save()
+
+        self.assertGreater(self.other_worker.get(LISTING_VERSION_KEY), version)
+        self.assertNotEqual(listing_key("page", "", ""), key)
+
+    def test_hits_and_misses_are_counted_across_workers(self):
+        key = listing_key("page", "python", "")
+        self.assertIsNone(get_cached_listing(key))
+        set_cached_listing(key, "<li>Python</li>")
+        self.assertEqual(get_cached_listing(key), "<li>Python</li>")
+        self.assertEqual(get_cached_listing(key), "<li>Python</li>")
+
+        stats = listing_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_ratio"]), (2, 1, 0.6667))
+        self.assertEqual(self.other_worker.get_many(["advert_listing:hits", "advert_listing:misses"]), {
+            "advert_listing:hits": 2, "advert_listing:misses": 1,
+        })
+
+
+class TakeTestTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.candidate = User.objects.create_user(email="candidate@example.com", password="password")
+        cls.category = TestCategory.objects.create(name="Python")
+        for _ in range(QUESTIONS_PER_TEST + 5):
+            create_question(cls.category)
+        cls.url = reverse("take_test", args=[cls.category.id])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.candidate)
+
+    def test_draw_is_kept_for_the_attempt(self):
+        self.client.get(self.url)
+        question_ids = self.client.session[f"test_attempt_{self.category.id}"]
+        self.assertEqual(len(question_ids), QUESTIONS_PER_TEST)
+        self.assertLessEqual(set(question_ids), set(self.category.questions.values_list("id", flat=True)))
+
+        self.client.get(self.url)
+        self.assertEqual(self.client.session[f"test_attempt_{self.category.id}"], question_ids)
+
+    def test_submission_is_graded_against_the_database(self):
+        self.client.get(self.url)
+        question_ids = self.client.session[f"test_attempt_{self.category.id}"]
+        # A queryset update fires no signals, like an edit made through another process's cache.
+        Question.objects.filter(pk__in=question_ids[:5]).update(correct_option="option2")
+
+        response = self.client.post(self.url, {str(pk): "option2" for pk in question_ids})
+
+        result = UserTestResult.objects.get(user=self.candidate)
+        self.assertRedirects(response, reverse("test_result", args=[result.id]), fetch_redirect_response=False)
+        self.assertEqual((result.score, result.total), (5, QUESTIONS_PER_TEST))
+        self.assertEqual(result.answers.filter(is_correct=True).count(), 5)
+        self.assertNotIn(f"test_attempt_{self.category.id}", self.client.session)
+
+    def test_stats_are_recorded_after_the_attempt_commits(self):
+        self.client.get(self.url)
+        question_ids = self.client.session[f"test_attempt_{self.category.id}"]
+        correct = question_ids[:3]
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.post(self.url, {str(pk): "option1" if pk in correct else "option2" for pk in question_ids})
+            self.assertFalse(CategoryStats.objects.exists())
+
+        self.assertEqual(len(callbacks), 1)
+        stats = CategoryStats.objects.get(category=self.category)
+        self.assertEqual((stats.attempts, stats.score_sum, stats.score_counts), (1, 3, {"3": 1}))
+        self.assertEqual(
+            sorted(QuestionStats.objects.filter(correct=1).values_list("question_id", flat=True)), sorted(correct)
+        )
+        self.assertEqual(QuestionStats.objects.filter(answered=1).count(), QUESTIONS_PER_TEST)
+
+    def test_submission_without_an_attempt_is_refused(self):
+        response = self.client.post(self.url, {})
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        self.assertFalse(UserTestResult.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class DownloadCvTests(TestCase):
+    CONTENT = b"0123456789abcdef"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        cls.applicant = User.objects.create_user(email="candidate@example.com", password="password")
+        cls.admin = User.objects.create_user(email="admin@example.com", password="password", role="admin")
+        application = create_application(create_advert(cls.company), email="Candidate@Example.com")
+        application.cv.save("cv.pdf", ContentFile(cls.CONTENT))
+        cls.application = application
+        cls.url = reverse("download_cv", args=[application.id])
+
+    def setUp(self):
+        self.client.force_login(self.company)
+
+    def get(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_owner_applicant_and_admin_may_download(self):
+        for user in (self.company, self.applicant, self.admin):
+            with self.subTest(user.email):
+                self.client.force_login(user)
+                response, body = self.get()
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(body, self.CONTENT)
+                self.assertEqual(response["Accept-Ranges"], "bytes")
+                self.assertIn('filename="cv-candidate.pdf"', response["Content-Disposition"])
+
+    def test_other_users_are_forbidden(self):
+        outsiders = (
+            create_company("other@example.com"),
+            User.objects.create_user(email="other.candidate@example.com", password="password"),
+        )
+        for user in outsiders:
+            with self.subTest(user.email):
+                self.client.force_login(user)
+                self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_byte_range(self):
+        response, body = self.get(range="bytes=0-3")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, b"0123")
+        self.assertEqual(response["Content-Range"], "bytes 0-3/16")
+        self.assertEqual(response["Content-Length"], "4")
+
+    def test_suffix_range(self):
+        response, body = self.get(range="bytes=-4")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, b"cdef")
+        self.assertEqual(response["Content-Range"], "bytes 12-15/16")
+
+    def test_unsatisfiable_range(self):
+        for header in ("bytes=16-", "bytes=8-4", "bytes=-0"):
+            with self.subTest(header):
+                response, _ = self.get(range=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response["Content-Range"], "bytes */16")
+
+    def test_malformed_or_multiple_ranges_get_the_full_body(self):
+        for header in ("bytes=0-1,4-5", "items=0-3"):
+            with self.subTest(header):
+                response, body = self.get(range=header)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(body, self.CONTENT)
+
+    def test_if_none_match(self):
+        etag = self.get()[0]["ETag"]
+        response, body = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(body, b"")
+
+    def test_if_range(self):
+        etag = self.get()[0]["ETag"]
+        response, body = self.get(range="bytes=0-3", if_range='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.CONTENT)
+
+        response, body = self.get(range="bytes=0-3", if_range=etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, b"0123")
+
+    @override_settings(CV_SENDFILE_HEADER="X-Accel-Redirect", CV_SENDFILE_PREFIX="/protected-media/")
+    def test_sendfile_header(self):
+        response, body = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.application.cv.name}")
+        self.assertEqual(body, b"")
+
+    @override_settings(CV_SENDFILE_HEADER="X-Sendfile")
+    def test_x_sendfile_header(self):
+        response, body = self.get()
+        self.assertEqual(response["X-Sendfile"], self.application.cv.path)
+        self.assertEqual(body, b"")
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ExportCvsTests(TestCase):
+
+    def setUp(self):
+        self.company = create_company()
+        self.advert = create_advert(self.company)
+        self.url = reverse("export_cvs", args=[self.advert.id])
+        self.client.force_login(self.company)
+
+    def test_archive_holds_each_cv_and_a_manifest_of_what_it_holds(self):
+        formula = create_application(self.advert, "formula@example.com")
+        JobApplication.objects.filter(pk=formula.pk).update(name="=1+2")
+        formula.refresh_from_db()
+        formula.cv.save("cv.pdf", ContentFile(b"first cv"))
+        # The factory's cvs/cv.pdf was never written to storage.
+        missing = create_application(self.advert, "missing@example.com")
+        no_cv = create_application(self.advert, "no.cv@example.com")
+        JobApplication.objects.filter(pk=no_cv.pk).update(cv="")
+        docx = create_application(self.advert, "docx@example.com")
+        docx.cv.save("cv.docx", ContentFile(b"second cv"))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(BytesIO(b"".join(response.streaming_content)))
+
+        formula_cv = f"cvs/12-{formula.id.hex[:12]}.pdf"
+        docx_cv = f"cvs/candidate-{docx.id.hex[:12]}.docx"
+        self.assertEqual(archive.namelist(), [formula_cv, docx_cv, "manifest.csv"])
+        self.assertEqual(archive.read(formula_cv), b"first cv")
+        self.assertEqual(archive.read(docx_cv), b"second cv")
+        manifest = list(csv.reader(archive.read("manifest.csv").decode().splitlines()))
+        self.assertEqual(manifest[0], ["name", "email", "status", "applied_at", "cv_file"])
+        self.assertEqual([(row[0], row[1], row[4]) for row in manifest[1:]], [
+            ("'=1+2", "formula@example.com", formula_cv),
+            ("Candidate", "missing@example.com", ""),
+            ("Candidate", "no.cv@example.com", ""),
+            ("Candidate", "docx@example.com", docx_cv),
+        ])
+        self.assertEqual(manifest[1][3], formula.created_at.isoformat())
+        self.assertEqual(missing.cv.name, "cvs/cv.pdf")
+
+    def test_other_companies_are_forbidden(self):
+        self.client.force_login(create_company("other@example.com"))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+@skipUnless(connection.vendor == "sqlite", "Drops the unique index inside the test's transaction")
+class DuplicateApplicationMigrationTests(TestCase):
+    migration = import_module("application_tracking.migrations.0007_unique_application_email")
+
+    def test_duplicates_stop_the_migration_and_are_listed(self):
+        advert = create_advert(create_company())
+        first = create_application(advert, email="dup@example.com")
+        create_application(advert, email="other@example.com")
+        with connection.cursor() as cursor:
+            cursor.execute("DROP INDEX jobapp_unique_email_per_advert")
+        second = create_application(advert, email="Dup@Example.com")
+        JobApplication.objects.filter(pk=second.pk).update_status(ApplicationStatus.INTERVIEW)
+
+        with self.assertRaises(RuntimeError) as raised:
+            self.migration.check_duplicate_applications(apps, None)
+
+        self.assertIn("1 advert/email pair(s)", str(raised.exception))
+        self.assertIn(
+            f"advert {advert.id}, dup@example.com: #{first.pk} (APPLIED), #{second.pk} (INTERVIEW)",
+            str(raised.exception),
+        )
+        self.assertEqual(JobApplication.objects.count(), 3)
+
+    def test_unique_applications_pass(self):
+        advert = create_advert(create_company())
+        create_application(advert, email="one@example.com")
+        create_application(advert, email="two@example.com")
+
+        self.migration.check_duplicate_applications(apps, None)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class MigrateCvStorageTests(TestCase):
+
+    def setUp(self):
+        self.legacy_storage = FileSystemStorage()
+        advert = create_advert(create_company())
+        self.applications = []
+        for email in ("first@example.com", "second@example.com"):
+            name = self.legacy_storage.save(f"cvs/{email}.pdf", ContentFile(b"%PDF-1.4 same cv"))
+            application = create_application(advert, email=email)
+            JobApplication.objects.filter(pk=application.pk).update(cv=name)
+            self.applications.append(name)
+
+    def test_moves_into_content_addressed_storage(self):
+        out = StringIO()
+        call_command("migrate_cv_storage", "--delete-originals", stdout=out)
+
+        names = set(JobApplication.objects.values_list("cv", flat=True))
+        self.assertEqual(len(names), 1)
+        [name] = names
+        self.assertRegex(name, r"^cvs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$")
+        self.assertEqual(StoredBlob.objects.get(name=name).ref_count, 2)
+        self.assertTrue(self.legacy_storage.exists(name))
+        for original in self.applications:
+            self.assertFalse(self.legacy_storage.exists(original))
+        self.assertIn("Moved 2 CV(s), 0 missing, 1 blob(s) recounted, 2 original(s) removed.", out.getvalue())
+
+    def test_dry_run_changes_nothing(self):
+        call_command("migrate_cv_storage", "--dry-run", stdout=StringIO())
+
+        self.assertCountEqual(JobApplication.objects.values_list("cv", flat=True), self.applications)
+        self.assertFalse(StoredBlob.objects.exists())
+
+
+SYNTHETIC_SIZES = (
+    "--candidates", "6", "--companies", "2", "--adverts-per-company", "3", "--applications-per-advert", "4",
+    "--categories", "2", "--questions-per-category", "10", "--tests-per-candidate", "2", "--questions-per-test", "5",
+    # Smaller than every table, so each one is written in several batches.
+    "--batch-size", "5",
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class GenerateSyntheticDataTests(TestCase):
+
+    def generate(self, *args):
+        out = StringIO()
+        call_command("generate_synthetic_data", *SYNTHETIC_SIZES, *args, stdout=out)
+        return out.getvalue()
+
+    def test_row_counts_and_derived_data(self):
+        output = self.generate()
+
+        self.assertIn(
+            "Created 6 candidates, 2 companies, 6 adverts, 24 applications, 20 questions, "
+            "12 test results and 60 answers.",
+            output,
+        )
+        self.assertEqual(User.objects.filter(role="candidate").count(), 6)
+        self.assertEqual(User.objects.filter(role="company").count(), 2)
+        self.assertEqual(JobApplication.objects.values("job_advert", "email").distinct().count(), 24)
+        self.assertEqual(StoredBlob.objects.get().ref_count, 24)
+        for result in UserTestResult.objects.annotate(answered=Count("answers"), correct=Sum("answers__is_correct")):
+            self.assertEqual((result.total, result.score), (result.answered, result.correct))
+        # Rebuilt after the bulk inserts, which fire no signals.
+        self.assertEqual(CategoryStats.objects.aggregate(Sum("attempts"))["attempts__sum"], 12)
+        self.assertEqual(get_search_backend().filter(JobAdvert.objects.all(), "Labs").count(), 6)
+
+    def test_clear_replaces_earlier_data(self):
+        self.generate()
+        self.assertIn("Removed earlier synthetic data.", self.generate("--clear"))
+
+        models = (User, JobAdvert, JobApplication, Question, UserTestResult, UserAnswer)
+        self.assertEqual([model.objects.count() for model in models], [8, 6, 24, 20, 12, 60])
+        self.assertEqual(CategoryStats.objects.aggregate(Sum("attempts"))["attempts__sum"], 12)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class BenchmarkUrlsTests(TestCase):
+
+    def test_times_each_route_and_rolls_back(self):
+        call_command("generate_synthetic_data", *SYNTHETIC_SIZES, stdout=StringIO())
+        User.objects.create_user(email="admin@example.com", password="password", role="admin")
+        before = [model.objects.count() for model in (Session, UserTestResult, UserAnswer, JobApplication)]
+        report_file = tempfile.NamedTemporaryFile(suffix=".json", delete=False).name
+        self.addCleanup(os.remove, report_file)
+        out = StringIO()
+
+        call_command(
+            "benchmark_urls", "--requests", "2", "--warmup", "0", "--output", report_file,
+            "--only", "search", "company_home", "take_test", "admin_candidates", "export_cvs",
+            stdout=out,
+        )
+
+        with open(report_file) as report:
+            urls = json.load(report)["urls"]
+        self.assertEqual(
+            {name: result["status"] for name, result in urls.items()},
+            dict.fromkeys(["search", "company_home", "take_test", "admin_candidates", "export_cvs"], 200),
+        )
+        self.assertTrue(all(result["queries"] > 0 for result in urls.values()))
+        self.assertIn(f"Wrote {report_file}", out.getvalue())
+        # Logins and the test attempt that take_test draws into the session are all rolled back.
+        self.assertEqual(
+            [model.objects.count() for model in (Session, UserTestResult, UserAnswer, JobApplication)], before
+        )
+
+
+class ViewFixtures:
+    # Logged-in requests start with two queries: the session and the user.
+    ROWS = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email="admin@example.com", password="password", role="admin")
+        cls.company = create_company()
+        cls.candidate = User.objects.create_user(email="candidate@example.com", password="password", role="candidate")
+        cls.category = TestCategory.objects.create(name="Python")
+        cls.result = UserTestResult.objects.create(user=cls.candidate, category=cls.category, score=3, total=cls.ROWS)
+        for i in range(cls.ROWS):
+            advert = create_advert(cls.company, title=f"Python Developer {i}")
+            create_application(advert)
+            create_application(advert, email=f"other{i}@example.com")
+            question = create_question(cls.category)
+            UserAnswer.objects.create(
+                user=cls.candidate, question=question, test_result=cls.result, selected_option="option1", is_correct=True
+            )
+        cls.advert = advert
+
+
+class QueryCountTests(ViewFixtures, QueryCountMixin, TestCase):
+
+    def test_listing(self):
+        self.assertViewQueries(self.candidate, reverse("search"), "search")
+
+    def test_keyword_search(self):
+        self.assertViewQueries(self.candidate, reverse("search") + "?keyword=python", "search_keyword")
+
+    def test_job_advert(self):
+        self.assertViewQueries(self.candidate, reverse("job_advert", args=[self.advert.id]), "job_advert")
+
+    def test_my_applications(self):
+        response = self.assertViewQueries(self.candidate, reverse("my_applications"), "my_applications")
+        self.assertContains(response, "Python Developer 0")
+
+    def test_my_jobs(self):
+        self.assertViewQueries(self.company, reverse("my_jobs"), "my_jobs")
+
+    def test_advert_applications(self):
+        self.assertViewQueries(
+            self.company, reverse("advert_applications", args=[self.advert.id]), "advert_applications"
+        )
+
+    def test_export_cvs(self):
+        self.assertViewQueries(self.company, reverse("export_cvs", args=[self.advert.id]), "export_cvs")
+
+    def test_test_categories(self):
+        self.assertViewQueries(self.candidate, reverse("test_categories"), "test_categories")
+
+    def test_take_test(self):
+        self.assertViewQueries(self.candidate, reverse("take_test", args=[self.category.id]), "take_test")
+
+    def test_test_result(self):
+        response = self.assertViewQueries(self.candidate, reverse("test_result", args=[self.result.id]), "test_result")
+        self.assertContains(response, "Question?", count=self.ROWS)
+
+    def test_company_home(self):
+        self.assertViewQueries(self.company, reverse("company_home"), "company_home")
+
+    def test_candidate_home(self):
+        self.assertViewQueries(self.candidate, reverse("candidate_home"), "candidate_home")
+
+
+class QueryInspectorTests(TestCase):
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE a = 'x''y' AND b = 12 AND c IN (%s, %s, %s) LIMIT 21"),
+            "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...) LIMIT ?",
+        )
+
+    def test_flags_n_plus_one(self):
+        company = create_company()
+        for i in range(3):
+            create_application(create_advert(company, title=f"Advert {i}"), email=f"candidate{i}@example.com")
+
+        with inspect_queries(duplicate_threshold=3) as inspector:
+            [application.job_advert.title for application in JobApplication.objects.all()]
+        [(sql, times)] = inspector.duplicates()
+        self.assertEqual(times, 3)
+        self.assertIn("application_tracking_jobadvert", sql)
+
+        with inspect_queries(duplicate_threshold=3) as inspector:
+            [application.job_advert.title for application in JobApplication.objects.select_related("job_advert")]
+        self.assertEqual(inspector.duplicates(), [])
+
+    def test_flags_slow_queries(self):
+        with inspect_queries(slow_query_ms=0) as inspector:
+            JobAdvert.objects.count()
+        self.assertEqual(len(inspector.slow_queries()), 1)
+        self.assertEqual(len(inspector.problems()), 1)
+
+    def test_baseline_regression(self):
+        baseline = QueryBaseline("/nonexistent/query_baseline.json")
+        baseline.updating = False
+        baseline.counts = {"search": 3}
+        self.assertIsNone(baseline.check("search", 3))
+        self.assertIn("up from the baseline of 3", baseline.check("search", 4))
+        self.assertIn("No query baseline", baseline.check("my_jobs", 3))
 
-# Create your tests here.
@@ -0,0 +1,50 @@
+import hashlib
+
+from django.conf import settings
+from django.core.files.storage import storages
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+
+DEFAULT_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+
+
+def max_upload_size() -> int:
+    return getattr(settings, "MAX_UPLOAD_SIZE", DEFAULT_MAX_UPLOAD_SIZE)
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream every uploaded file to a temporary file chunk by chunk, hashing it
+    with SHA-256 on the way and refusing it as soon as it grows past
+    MAX_UPLOAD_SIZE, so an oversized upload is never held in memory or
+    written out in full.
+
+    The digest is exposed as ``uploaded_file.sha256``; refused fields are
+    reported on ``request.rejected_uploads`` for the view to turn into form
+    errors. Install it per view, ahead of the default handlers, before
+    ``request.POST`` is first read (see views.apply).
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > max_upload_size():
+            rejected = getattr(self.request, "rejected_uploads", {})
+            rejected[self.field_name] = f"File is too large. The maximum size is {filesizeformat(max_upload_size())}."
+            self.request.rejected_uploads = rejected
+            raise SkipFile()
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        uploaded_file.sha256 = self.sha256.hexdigest()
+        return uploaded_file
+
+
+def select_cv_storage():
+    return storages["cvs"]
@@ -4,6 +4,7 @@ from . import views
 urlpatterns=[
     path("",views.search,name="search"),
     path("search/",views.search,name="search"),
+    path("search/cache-stats/",views.listing_cache_stats_view,name="listing_cache_stats"),
     path("create/",views.create_advert,name="create_advert"),
     path("my-applications/",views.my_applications,name="my_applications"),
     path("my-jobs/",views.my_jobs,name="my_jobs"),
@@ -11,6 +12,9 @@ urlpatterns=[
     path("<uuid:advert_id>/apply/",views.apply,name="apply_for_job"),
     path("<uuid:advert_id>/applications/",views.advert_applications,name="advert_applications"),
     path("<uuid:job_application_id>/decide/",views.decide,name="decide"),
+    path("<uuid:job_application_id>/cv/",views.download_cv,name="download_cv"),
+    path("<uuid:advert_id>/applications/decide/",views.bulk_decide,name="bulk_decide"),
+    path("<uuid:advert_id>/applications/cvs.zip",views.export_cvs,name="export_cvs"),
     path("<uuid:advert_id>/update/",views.update_advert,name="update_advert"),
     path("<uuid:advert_id>/delete/",views.delete_advert,name="delete_advert"),
     path("tests/", views.test_categories, name="test_categories"),
@@ -1,14 +1,33 @@
+import hashlib
+import json
+import mimetypes
+import os
+import uuid
+
 from django.shortcuts import render, redirect, get_object_or_404
 from .forms import JobAdvertForm, JobApplicationForm
-from django.http import HttpRequest
+from django.conf import settings
+from django.http import Http404, HttpRequest, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from .models import JobAdvert, JobApplication
 from django.contrib import messages
 from django.utils import timezone
 from django.core.paginator import Paginator
+from common.http import sendfile_response, serve_file
+from common.pagination import CursorPaginator
+from common.streaming import csv_stream, zip_stream
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.http import content_disposition_header, quote_etag
+from django.utils.text import slugify
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.db import IntegrityError, transaction
 from django.db.models import Count, Q
-from common.tasks import send_email
 from application_tracking.enums import ApplicationStatus
+from .search import get_search_backend
+from .uploads import HashingFileUploadHandler
+from .caching import get_cached_listing, listing_cache_stats, listing_key, set_cached_listing
+from accounts.views import admin_required
 
 # ---------------- JOB VIEWS ---------------- #
 
@@ -43,37 +62,90 @@ def get_advert(request: HttpRequest, advert_id):
     return render(request, "advert.html", context)
 
 
-def list_adverts(request: HttpRequest):
-    active_jobs = JobAdvert.objects.filter(
-        is_published=True, deadline__gte=timezone.now().date()
-    )
-    paginator = Paginator(active_jobs, 10)
-    requested_page = request.GET.get("page")
-    paginated_adverts = paginator.get_page(requested_page)
+def render_advert_listing(request: HttpRequest, keyword: str = "", location: str = ""):
+    """
+    Render the public advert listing, serving the page fragment and the total
+    count from the cache. Keys cover (keyword, location, page/cursor, date) and
+    are versioned, so any JobAdvert save or delete invalidates them all at once.
+    """
+    today = timezone.now().date()
+    requested_page = request.GET.get("page") or "1"
+    cursor = request.GET.get("cursor") or ""
+    page_key = listing_key("page", keyword, location, requested_page, cursor, today)
+
+    listing_html = get_cached_listing(page_key)
+    if listing_html is None:
+        query = Q()
+
+        if location:
+            query &= Q(location__icontains=location)
+
+        active_jobs = JobAdvert.objects.filter(
+            is_published=True, deadline__gte=today
+        )
+        result = active_jobs.filter(query)
+
+        if keyword:
+            # Relevance-ranked results cannot be keyset-paginated on (created_at, id).
+            result = get_search_backend().filter(result, keyword)
+            paginator = Paginator(result, 10)
+            count_key = listing_key("count", keyword, location, today)
+            count = get_cached_listing(count_key)
+            if count is None:
+                count = paginator.count
+                set_cached_listing(count_key, count)
+            else:
+                paginator.count = count
+            paginated_adverts = paginator.get_page(requested_page)
+        else:
+            paginated_adverts = CursorPaginator(result, 10).get_page(cursor)
+
+        listing_html = render_to_string(
+            "advert_listing.html", {"job_adverts": paginated_adverts}, request=request
+        )
+        set_cached_listing(page_key, listing_html)
 
     context = {
-        "job_adverts": paginated_adverts
+        "listing_html": mark_safe(listing_html)
     }
     return render(request, "home.html", context)
 
 
+def list_adverts(request: HttpRequest):
+    return render_advert_listing(request)
+
+
+@csrf_exempt
 def apply(request: HttpRequest, advert_id):
+    # The CV is hashed and size-checked as it streams in. Upload handlers can only be
+    # changed before request.POST is read, which the CSRF check does, so that check
+    # runs in _apply instead, after the handler is in place.
+    request.upload_handlers.insert(0, HashingFileUploadHandler(request))
+    return _apply(request, advert_id)
+
+
+@csrf_protect
+def _apply(request: HttpRequest, advert_id):
     advert = get_object_or_404(JobAdvert, pk=advert_id)
 
     if request.method == "POST":
         form = JobApplicationForm(request.POST, request.FILES)
-        if form.is_valid():
-            email = form.cleaned_data["email"]
-
-            # check duplicate application
-            if advert.applications.filter(email__iexact=email).exists():
-                messages.error(request, "You have already applied for this position")
-                return redirect("job_advert", advert_id=advert_id)
+        for field, error in getattr(request, "rejected_uploads", {}).items():
+            form.add_error(field, error)
 
-            # save the new application
+        if form.is_valid():
+            # save the new application; the unique (advert, lower(email)) constraint
+            # rejects duplicates atomically, even for concurrent submissions
             application: JobApplication = form.save(commit=False)
             application.job_advert = advert
-            application.save()
+            try:
+                with transaction.atomic():
+                    application.save()
+            except IntegrityError:
+                # The CV reference was rolled back with the row; drop the blob if it is now orphaned.
+                application.cv.storage.delete_if_unreferenced(application.cv.name)
+                messages.error(request, "You have already applied for this position")
+                return redirect("job_advert", advert_id=advert_id)
 
             messages.success(request, "Application submitted successfully.")
             return redirect("job_advert", advert_id=advert_id)
@@ -90,10 +162,16 @@ def apply(request: HttpRequest, advert_id):
 @login_required
 def my_applications(request: HttpRequest):
     user = request.user
-    applications = JobApplication.objects.filter(email=user.email)
-    paginator = Paginator(applications, 10)
-    requested_page = request.GET.get("page")
-    paginated_applications = paginator.get_page(requested_page)
+    applications = (
+        JobApplication.objects.filter(email=user.email)
+        .select_related("job_advert")
+        .only(
+            "id", "name", "email", "portfolio_url", "cv", "status", "created_at",
+            "job_advert__id", "job_advert__title", "job_advert__created_at",
+        )
+        .annotate(total_applicants=Count("job_advert__applications"))
+    )
+    paginated_applications = CursorPaginator(applications, 10).get_page(request.GET.get("cursor"))
 
     context = {
         "my_applications": paginated_applications
@@ -107,9 +185,7 @@ def my_jobs(request: HttpRequest):
     jobs = JobAdvert.objects.filter(created_by=user).annotate(
         total_applicants=Count("applications")
     )
-    paginator = Paginator(jobs, 10)
-    requested_page = request.GET.get("page")
-    paginated_jobs = paginator.get_page(requested_page)
+    paginated_jobs = CursorPaginator(jobs, 10).get_page(request.GET.get("cursor"))
 
     context = {
         "my_jobs": paginated_jobs,
@@ -153,12 +229,10 @@ def delete_advert(request: HttpRequest, advert_id):
 def advert_applications(request: HttpRequest, advert_id):
     advert = get_object_or_404(JobAdvert, pk=advert_id)
     if request.user != advert.created_by:
-        return HttpReponseForbidden("You can only see applications for an advert created by you.")
+        return HttpResponseForbidden("You can only see applications for an advert created by you.")
 
     applications = advert.applications.all()
-    paginator = Paginator(applications, 10)
-    requested_page = request.GET.get("page")
-    paginated_applications = paginator.get_page(requested_page)
+    paginated_applications = CursorPaginator(applications, 10).get_page(request.GET.get("cursor"))
 
     context = {
         "applications": paginated_applications,
@@ -167,71 +241,205 @@ def advert_applications(request: HttpRequest, advert_id):
     return render(request, "advert_applications.html", context)
 
 
+@login_required
+def download_cv(request: HttpRequest, job_application_id):
+    """
+    Serve an applicant's CV to the advert owner, the applicant or an admin.
+
+    Supports Range and If-None-Match; when CV_SENDFILE_HEADER is configured the
+    transfer is handed to the front-end proxy instead of streamed by Django.
+    """
+    application = get_object_or_404(
+        JobApplication.objects.select_related("job_advert").only(
+            "name", "email", "cv", "job_advert", "job_advert__created_by"
+        ),
+        pk=job_application_id,
+    )
+    user = request.user
+    allowed = (
+        user.id == application.job_advert.created_by_id
+        or user.email.lower() == application.email.lower()
+        or getattr(user, "role", None) == "admin"
+    )
+    if not allowed:
+        return HttpResponseForbidden("You can only download CVs sent to your adverts.")
+    if not application.cv:
+        raise Http404("This application has no CV.")
+
+    name = application.cv.name
+    filename = f"cv-{slugify(application.name) or 'applicant'}{os.path.splitext(name)[1]}"
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    etag = quote_etag(hashlib.sha1(name.encode()).hexdigest())
+
+    sendfile_header = getattr(settings, "CV_SENDFILE_HEADER", None)
+    if sendfile_header == "X-Accel-Redirect":
+        location = settings.CV_SENDFILE_PREFIX.rstrip("/") + "/" + name
+        return sendfile_response(sendfile_header, location, filename=filename, etag=etag, content_type=content_type)
+    if sendfile_header == "X-Sendfile":
+        location = application.cv.storage.path(name)
+        return sendfile_response(sendfile_header, location, filename=filename, etag=etag, content_type=content_type)
+
+    try:
+        cv_file = application.cv.storage.open(name, "rb")
+    except FileNotFoundError:
+        raise Http404("CV file is missing.")
+    return serve_file(request, cv_file, filename=filename, etag=etag, content_type=content_type)
+
+
+def _cv_archive_name(application: JobApplication) -> str:
+    extension = os.path.splitext(application.cv.name)[1]
+    return f"cvs/{slugify(application.name) or 'applicant'}-{application.id.hex[:12]}{extension}"
+
+
+def _cv_archive_members(advert: JobAdvert):
+    """
+    Archive members for export_cvs: every CV, then a manifest, in one pass
+    over a server-side iterator. zip_stream has written a member by the time
+    it asks for the next one, so a CV is only listed in the manifest once it
+    is in the archive; one whose file is missing is listed without a file.
+    """
+    applications = advert.applications.only(
+        "id", "job_advert_id", "name", "email", "status", "cv", "created_at"
+    ).order_by("created_at", "id")
+
+    manifest_rows = []
+    for application in applications.iterator(chunk_size=200):
+        cv_file = ""
+        if application.cv:
+            try:
+                opened = application.cv.storage.open(application.cv.name, "rb")
+            except FileNotFoundError:
+                opened = None
+            if opened is not None:
+                with opened:
+                    yield _cv_archive_name(application), opened.chunks()
+                cv_file = _cv_archive_name(application)
+        manifest_rows.append(
+            (application.name, application.email, application.status, application.created_at.isoformat(), cv_file)
+        )
+    yield "manifest.csv", csv_stream(("name", "email", "status", "applied_at", "cv_file"), manifest_rows)
+
+
+@login_required
+def export_cvs(request: HttpRequest, advert_id):
+    """Stream a ZIP of every CV sent to an advert plus a CSV manifest, built on the fly."""
+    advert = get_object_or_404(JobAdvert.objects.only("id", "title", "created_by_id"), pk=advert_id)
+    if request.user.id != advert.created_by_id and getattr(request.user, "role", None) != "admin":
+        return HttpResponseForbidden("You can only export applications for an advert created by you.")
+
+    response = StreamingHttpResponse(zip_stream(_cv_archive_members(advert)), content_type="application/zip")
+    response["Content-Disposition"] = content_disposition_header(True, f"{slugify(advert.title) or 'advert'}-cvs.zip")
+    return response
+
+
 @login_required
 def decide(request: HttpRequest, job_application_id):
-    job_application = get_object_or_404(JobApplication, pk=job_application_id)
+    job_application = get_object_or_404(
+        JobApplication.objects.select_related("job_advert").only("job_advert", "job_advert__created_by"),
+        pk=job_application_id,
+    )
+    advert_id = job_application.job_advert_id
 
-    if request.user != job_application.job_advert.created_by:
+    if request.user.id != job_application.job_advert.created_by_id:
         return HttpResponseForbidden("You can only decide on an advert created by you.")
 
     if request.method == "POST":
         status = request.POST.get("status")
-        job_application.status = status
-        job_application.save(update_fields=["status"])
+        if status not in ApplicationStatus.values:
+            messages.error(request, "Invalid application status")
+            return redirect("advert_applications", advert_id=advert_id)
+
+        JobApplication.objects.filter(pk=job_application.pk).update_status(status)
         messages.success(request, f"Application status updated to {status}")
 
-        if status == ApplicationStatus.REJECTED:
-            context = {
-                "application_name": job_application.name,
-                "job_title": job_application.job_advert.title,
-                "company_name": job_application.job_advert.company_name,
-            }
-            send_email(
-                f"Application Outcome for {job_application.job_advert.title}",
-                [job_application.email],
-                "emails/job_application_update.html",
-                context
-            )
+    return redirect("advert_applications", advert_id=advert_id)
 
-        return redirect("advert_applications", advert_id=job_application.job_advert.id)
 
+@login_required
+def bulk_decide(request: HttpRequest, advert_id):
+    """
+    Apply one status to many applications of an advert.
+
+    Accepts a form post (``application_ids`` + ``status``) from the applications
+    page, or a JSON body with the same keys, in which case the per-application
+    outcome ("updated", "unchanged" or "not_found") is returned as JSON.
+    """
+    advert = get_object_or_404(JobAdvert.objects.only("id", "created_by_id"), pk=advert_id)
+    if request.user.id != advert.created_by_id:
+        return HttpResponseForbidden("You can only decide on an advert created by you.")
 
-def search(request: HttpRequest):
-    keyword = request.GET.get('keyword')
-    location = request.GET.get('location')
+    if request.method != "POST":
+        return redirect("advert_applications", advert_id=advert_id)
+
+    wants_json = request.content_type == "application/json"
+    if wants_json:
+        try:
+            payload = json.loads(request.body or b"{}")
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            return JsonResponse({"error": "Invalid JSON body"}, status=400)
+        raw_ids = payload.get("application_ids") or []
+        status = payload.get("status")
+    else:
+        raw_ids = request.POST.getlist("application_ids")
+        status = request.POST.get("status")
 
-    query = Q()
+    if status not in ApplicationStatus.values or not isinstance(raw_ids, list):
+        if wants_json:
+            return JsonResponse({"error": "Expected a list of application_ids and a valid status"}, status=400)
+        messages.error(request, "Select at least one application and a valid status")
+        return redirect("advert_applications", advert_id=advert_id)
+
+    application_ids = {}
+    for raw_id in raw_ids:
+        try:
+            application_ids[str(raw_id)] = uuid.UUID(str(raw_id))
+        except ValueError:
+            application_ids[str(raw_id)] = None
+
+    applications = advert.applications.filter(
+        pk__in=[pk for pk in application_ids.values() if pk is not None]
+    )
+    current_status = dict(applications.values_list("id", "status"))
+    updated = applications.update_status(status)
 
-    if keyword:
-        query &= (
-            Q(title__icontains=keyword)
-            | Q(company_name__icontains=keyword)
-            | Q(description__icontains=keyword)
-            | Q(skills__icontains=keyword)
-        )
+    results = {}
+    for raw_id, pk in application_ids.items():
+        if pk not in current_status:
+            results[raw_id] = "not_found"
+        elif current_status[pk] == status:
+            results[raw_id] = "unchanged"
+        else:
+            results[raw_id] = "updated"
 
-    if location:
-        query &= Q(location__icontains=location)
+    if wants_json:
+        return JsonResponse({"status": status, "updated": updated, "results": results})
 
-    active_jobs = JobAdvert.objects.filter(
-        is_published=True, deadline__gte=timezone.now().date()
-    )
-    result = active_jobs.filter(query)
-    paginator = Paginator(result, 10)
-    requested_page = request.GET.get("page")
-    paginated_adverts = paginator.get_page(requested_page)
+    messages.success(request, f"{updated} application(s) updated to {status}")
+    return redirect("advert_applications", advert_id=advert_id)
 
-    context = {
-        "job_adverts": paginated_adverts
-    }
-    return render(request, "home.html", context)
+
+def search(request: HttpRequest):
+    keyword = (request.GET.get('keyword') or "").strip()
+    location = (request.GET.get('location') or "").strip()
+    return render_advert_listing(request, keyword, location)
+
+
+@login_required
+@admin_required
+def listing_cache_stats_view(request: HttpRequest):
+    return JsonResponse(listing_cache_stats())
 
 
 # ---------------- TEST VIEWS ---------------- #
 
 import random
+from functools import partial
 from django.contrib import messages
 from .models import TestCategory, Question, UserTestResult, UserAnswer
+from .caching import get_question_pool_ids, get_questions
+from .stats import record_test_result
 
 @login_required
 def test_categories(request):
@@ -239,62 +447,106 @@ def test_categories(request):
     return render(request, "tests/categories.html", {"categories": categories})
 
 
+QUESTIONS_PER_TEST = 20
+
+
+def _attempt_session_key(category_id) -> str:
+    return f"test_attempt_{category_id}"
+
+
+def _draw_question_ids(category: TestCategory) -> list[int]:
+    """Pick the question ids for a new attempt from the cached id pool."""
+    pool_ids = get_question_pool_ids(category.id)
+    return random.sample(pool_ids, min(len(pool_ids), QUESTIONS_PER_TEST))
+
+
 @login_required
 def take_test(request, category_id):
     category = get_object_or_404(TestCategory, id=category_id)
-
-    # Fetch all questions in this category
-    questions_pool = list(category.questions.all())
-    num_questions = min(len(questions_pool), 20)
-    selected_questions = random.sample(questions_pool, num_questions)
+    session_key = _attempt_session_key(category.id)
+
+    # The question set is drawn once per attempt and kept in the session, so the
+    # submission is graded against exactly the questions the candidate was shown.
+    question_ids = request.session.get(session_key)
+    if question_ids is None:
+        if request.method == "POST":
+            messages.error(request, "Your test session has expired. Please start the test again.")
+            return redirect("take_test", category_id=category.id)
+        question_ids = _draw_question_ids(category)
+        request.session[session_key] = question_ids
 
     if request.method == "POST":
-        score = 0
-
-        # Create a new UserTestResult for this attempt
-        test_result = UserTestResult.objects.create(
-            user=request.user,
-            category=category,
-            score=0,  # update later
-            total=num_questions
+        # Grade against the database, not the cached payloads: a cached payload can
+        # outlive an edit to the answer key (e.g. an eviction race or a cache outage)
+        correct_options = dict(
+            Question.objects.filter(pk__in=question_ids, category_id=category.id).values_list("id", "correct_option")
         )
+        num_questions = len(correct_options)
+        score = 0
+        answers = []
 
-        # Save each answer safely
-        for question in selected_questions:
-            user_answer_value = request.POST.get(str(question.id))
+        # Grade in memory first so the result row is written once, with its final score
+        for question_id in question_ids:
+            if question_id not in correct_options:  # deleted or moved since it was drawn
+                continue
+            user_answer_value = request.POST.get(str(question_id))
 
             if not user_answer_value:  # skip unanswered
                 continue
 
-            is_correct = user_answer_value == question.correct_option
+            is_correct = user_answer_value == correct_options[question_id]
             if is_correct:
                 score += 1
 
-            UserAnswer.objects.create(
+            answers.append(UserAnswer(
                 user=request.user,
-                question=question,
+                question_id=question_id,
                 selected_option=user_answer_value,
                 is_correct=is_correct,
-                test_result=test_result
+            ))
+
+        # One transaction: the result INSERT and a single multi-row INSERT for the answers
+        with transaction.atomic():
+            test_result = UserTestResult.objects.create(
+                user=request.user,
+                category=category,
+                score=score,
+                total=num_questions
             )
+            for answer in answers:
+                answer.test_result = test_result
+            UserAnswer.objects.bulk_create(answers)
+        # The statistics lock their category's row, so they are updated after the attempt
+        # commits rather than inside it; concurrent submitters then only queue for that
+        # short update. A failure there is logged and does not fail the submission.
+        transaction.on_commit(partial(record_test_result, test_result, answers), robust=True)
 
-        # Update score
-        test_result.score = score
-        test_result.save()
+        del request.session[session_key]
 
         messages.success(request, f"Test completed! You scored {score}/{num_questions}.")
         return redirect("test_result", result_id=test_result.id)
 
     return render(request, "tests/take_test.html", {
         "category": category,
-        "questions": selected_questions
+        "questions": get_questions(category.id, question_ids)
     })
 
 
 @login_required
 def test_result(request, result_id):
-    result = get_object_or_404(UserTestResult, id=result_id, user=request.user)
-    answers = result.answers.all()  # All UserAnswer objects for this attempt
+    result = get_object_or_404(
+        UserTestResult.objects.select_related("category", "user").only(
+            "id", "score", "total", "date_taken", "category__name", "user__email"
+        ),
+        id=result_id,
+        user=request.user,
+    )
+    # All UserAnswer objects for this attempt, each with its question in the same query
+    answers = result.answers.select_related("question").only(
+        "selected_option", "is_correct", "test_result_id",
+        "question__question_text", "question__option1", "question__option2",
+        "question__option3", "question__option4", "question__correct_option",
+    ).order_by("id")
 
     return render(request, "tests/result.html", {
         "result": result,
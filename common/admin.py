@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import EmailJob
+
+
+@admin.register(EmailJob)
+class EmailJobAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
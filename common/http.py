@@ -0,0 +1,118 @@
+import re
+
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import content_disposition_header, parse_etags
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def etag_matches(etag: str, header: str | None) -> bool:
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return "*" in etags or etag in etags
+
+
+def parse_range(header: str | None, size: int):
+    """
+    Parse a single ``bytes=`` range into an inclusive ``(start, end)``.
+
+    Returns None when the header is absent, malformed or asks for several
+    ranges (the full body is served instead, as RFC 9110 allows), and False
+    when the range cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+class RangeFileWrapper:
+    """Iterate over ``length`` bytes of ``file`` from ``offset`` in fixed-size chunks."""
+
+    def __init__(self, file, offset: int, length: int, chunk_size: int = STREAM_CHUNK_SIZE):
+        self.file = file
+        self.offset = offset
+        self.remaining = length
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        self.file.seek(self.offset)
+        while self.remaining > 0:
+            data = self.file.read(min(self.chunk_size, self.remaining))
+            if not data:
+                break
+            self.remaining -= len(data)
+            yield data
+
+    def close(self):
+        self.file.close()
+
+
+def serve_file(request, file, *, filename: str, etag: str, content_type: str = "application/octet-stream"):
+    """
+    Stream ``file`` (an open file object of known ``size``) with support for
+    If-None-Match, Range and If-Range. ``etag`` must be a quoted entity tag.
+    """
+    if etag_matches(etag, request.headers.get("If-None-Match")):
+        file.close()
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+
+    size = file.size
+    byte_range = parse_range(request.headers.get("Range"), size)
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range != etag:
+        byte_range = None
+
+    if byte_range is False:
+        file.close()
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    elif byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            RangeFileWrapper(file, start, end - start + 1), status=206, content_type=content_type
+        )
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Disposition"] = content_disposition_header(False, filename)
+    else:
+        response = FileResponse(file, filename=filename, content_type=content_type)
+        response["Content-Length"] = str(size)
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, max-age=0, must-revalidate"
+    return response
+
+
+def sendfile_response(header: str, location: str, *, filename: str, etag: str,
+                      content_type: str = "application/octet-stream"):
+    """
+    Hand the transfer to the front-end proxy (``X-Accel-Redirect`` for nginx,
+    ``X-Sendfile`` for Apache/lighttpd), which then deals with ranges itself.
+    """
+    response = HttpResponse(content_type=content_type)
+    response[header] = location
+    response["Content-Disposition"] = content_disposition_header(False, filename)
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, max-age=0, must-revalidate"
+    return response
@@ -0,0 +1,61 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(output: str):
+    """``(self_us, cumulative_us, depth, module)`` for each line of ``-X importtime`` output."""
+    for line in output.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            own, cumulative, indent, module = match.groups()
+            yield int(own), int(cumulative), (len(indent) - 1) // 2, module
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start per worker: run `python -X importtime manage.py <command>` "
+        "in fresh processes and report wall time, import time and the slowest imports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--top", type=int, default=15, help="How many of the slowest top-level imports to list.")
+        parser.add_argument("--target", default="check", help="The management command to start (default: check).")
+
+    def handle(self, *args, **options):
+        manage_py = Path(settings.BASE_DIR) / "manage.py"
+        walls, import_totals, slowest = [], [], {}
+        for _ in range(options["runs"]):
+            started = time.perf_counter()
+            process = subprocess.run(
+                [sys.executable, "-X", "importtime", str(manage_py), options["target"]],
+                capture_output=True, text=True, env=os.environ.copy(),
+            )
+            walls.append(time.perf_counter() - started)
+            if process.returncode:
+                raise CommandError(f"manage.py {options['target']} failed:\n{process.stderr[-2000:]}")
+
+            imports = list(parse_importtime(process.stderr))
+            import_totals.append(sum(own for own, _, _, _ in imports) / 1e6)
+            for _, cumulative, depth, module in imports:
+                if depth == 0:
+                    slowest.setdefault(module, []).append(cumulative / 1e3)
+
+        self.stdout.write(
+            f"manage.py {options['target']} over {options['runs']} runs: "
+            f"wall median {statistics.median(walls):.3f}s (min {min(walls):.3f}s), "
+            f"imports median {statistics.median(import_totals):.3f}s"
+        )
+        ranked = sorted(slowest.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+        for module, timings in ranked[:options["top"]]:
+            self.stdout.write(f"  {statistics.median(timings):8.1f} ms  {module}")
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from common.tasks import process_email_queue
+
+
+class Command(BaseCommand):
+    help = "Deliver queued emails from the outbox, retrying failures with exponential backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50, help="Jobs claimed per batch.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Drain the currently due jobs and exit.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        while True:
+            sent, failed = process_email_queue(batch_size)
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} email(s), {failed} failed.")
+            if sent + failed < batch_size:
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
@@ -1,6 +1,7 @@
 import uuid 
 
 from django.db import models
+from django.utils import timezone
 
 class BaseModel(models.Model):
     id=models.UUIDField(primary_key=True,editable=False,default=uuid.uuid4)
@@ -10,3 +11,43 @@ class BaseModel(models.Model):
 
     class Meta:
         abstract=True
+
+
+class EmailStatus(models.TextChoices):
+    PENDING = "PENDING", "Pending"
+    SENT = "SENT", "Sent"
+    DEAD_LETTER = "DEAD_LETTER", "Dead letter"
+
+
+class EmailJob(BaseModel):
+    """A rendered email waiting in the outbox for the queue worker to deliver it."""
+
+    subject = models.CharField(max_length=255)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    html_body = models.TextField()
+    status = models.CharField(max_length=20, choices=EmailStatus.choices, default=EmailStatus.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("next_attempt_at",)
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="emailjob_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class StoredBlob(BaseModel):
+    """Reference count for a file kept by common.storage.ContentAddressedStorage."""
+
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
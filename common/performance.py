@@ -0,0 +1,180 @@
+"""
+Per-view request timing: wall time, query count, SQL time, template render
+time and response size, kept as a rolling window of samples per view in
+process memory and reported as percentiles.
+
+Enable with the PERFORMANCE_MONITORING setting. When it is off,
+PerformanceMiddleware raises MiddlewareNotUsed, so Django drops it from the
+stack and requests pay nothing for it.
+"""
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+DEFAULT_SAMPLE_SIZE = 1000
+PERCENTILES = (50, 90, 99)
+METRICS = ("total_ms", "db_ms", "queries", "template_ms", "response_bytes")
+
+
+class QueryTimer:
+    """``connection.execute_wrapper`` callable counting queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class TemplateTimer:
+    def __init__(self):
+        self.seconds = 0.0
+        self.depth = 0
+
+
+_template_timer = ContextVar("template_timer", default=None)
+_patch_lock = threading.Lock()
+_patch_users = 0
+_original_render = None
+
+
+def _timed_render(self, *args, **kwargs):
+    timer = _template_timer.get()
+    if timer is None:
+        return _original_render(self, *args, **kwargs)
+    timer.depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, *args, **kwargs)
+    finally:
+        timer.depth -= 1
+        if not timer.depth:
+            timer.seconds += time.perf_counter() - started
+
+
+@contextmanager
+def time_templates(timer: TemplateTimer):
+    """
+    Time the DjangoTemplates renders made inside the block into ``timer``.
+    Only the outermost render is timed, so a template rendered from inside
+    another is not counted twice.
+
+    Template.render is wrapped while at least one measured request is in
+    flight and restored when the last one finishes; renders of other
+    threads in that window find no timer in their context and pass through.
+    """
+    global _patch_users, _original_render
+    from django.template.backends.django import Template
+
+    with _patch_lock:
+        if not _patch_users:
+            _original_render = Template.render
+            Template.render = _timed_render
+        _patch_users += 1
+    token = _template_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _template_timer.reset(token)
+        with _patch_lock:
+            _patch_users -= 1
+            if not _patch_users:
+                Template.render = _original_render
+                _original_render = None
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+class PerformanceStore:
+    """The last ``size`` samples of each view, shared by the threads of one process."""
+
+    def __init__(self, size=DEFAULT_SAMPLE_SIZE):
+        self.size = size
+        self.samples = defaultdict(lambda: deque(maxlen=self.size))
+        self.lock = threading.Lock()
+
+    def record(self, view, sample):
+        with self.lock:
+            self.samples[view].append(sample)
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+
+    def summary(self):
+        with self.lock:
+            samples = {view: list(window) for view, window in self.samples.items()}
+        summary = {}
+        for view, window in sorted(samples.items()):
+            stats = {"count": len(window)}
+            for metric in METRICS:
+                values = sorted(sample[metric] for sample in window if sample[metric] is not None)
+                if not values:
+                    continue
+                stats[metric] = {f"p{p}": round(percentile(values, p), 3) for p in PERCENTILES}
+                stats[metric]["max"] = round(values[-1], 3)
+            summary[view] = stats
+        return summary
+
+
+store = PerformanceStore(getattr(settings, "PERFORMANCE_SAMPLE_SIZE", DEFAULT_SAMPLE_SIZE))
+
+
+def server_timing(sample):
+    return ", ".join([
+        f"app;dur={sample['total_ms']:.1f}",
+        f'db;dur={sample["db_ms"]:.1f};desc="{sample["queries"]} queries"',
+        f"tpl;dur={sample['template_ms']:.1f}",
+    ])
+
+
+class PerformanceMiddleware:
+    """
+    Record one sample per request and add a Server-Timing header. Place it
+    near the top of MIDDLEWARE so the time covers the rest of the stack.
+    The body of a streaming response is produced after the middleware
+    returns, so only the time to the first byte is measured for those.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PERFORMANCE_MONITORING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            templates = stack.enter_context(time_templates(TemplateTimer()))
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        sample = {
+            "total_ms": elapsed * 1000,
+            "db_ms": queries.seconds * 1000,
+            "queries": queries.count,
+            "template_ms": templates.seconds * 1000,
+            "response_bytes": None if response.streaming else len(response.content),
+        }
+        store.record(match.view_name if match else "<unresolved>", sample)
+        response["Server-Timing"] = server_timing(sample)
+        return response
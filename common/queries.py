@@ -0,0 +1,173 @@
+"""
+Query inspection for development and CI.
+
+QueryInspector is a ``connection.execute_wrapper`` that records every query
+of a request (or any block, via ``inspect_queries()``), groups identical
+statements after normalizing their literals, and reports:
+
+* repeated statements (run DUPLICATE_THRESHOLD times or more), which is how
+  an N+1 pattern shows up;
+* single queries slower than SLOW_QUERY_MS.
+
+QueryInspectorMiddleware runs it on every request when the QUERY_INSPECTOR
+setting enables it and hands any findings to the REPORTER callable (logging
+by default). QueryBaseline compares per-view query counts against a JSON file
+kept in the repository so the test suite can fail on a regression.
+"""
+import json
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": False,
+    "SLOW_QUERY_MS": 100,
+    "DUPLICATE_THRESHOLD": 3,
+    "REPORTER": "common.queries.log_problems",
+}
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r"IN \((?:%s|\?)(?:, (?:%s|\?))*\)")
+# Transaction control is not a query to optimize; its time is spent waiting on locks.
+TRANSACTION_RE = re.compile(r"^\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b", re.IGNORECASE)
+
+
+def inspector_settings():
+    return {**DEFAULTS, **getattr(settings, "QUERY_INSPECTOR", {})}
+
+
+def normalize_sql(sql: str) -> str:
+    """Strip literals and collapse IN lists so the same statement with different values groups together."""
+    sql = STRING_RE.sub("?", sql)
+    sql = NUMBER_RE.sub("?", sql)
+    return IN_LIST_RE.sub("IN (...)", sql)
+
+
+class QueryInspector:
+
+    def __init__(self, slow_query_ms=None, duplicate_threshold=None):
+        options = inspector_settings()
+        self.slow_query_ms = options["SLOW_QUERY_MS"] if slow_query_ms is None else slow_query_ms
+        self.duplicate_threshold = (
+            options["DUPLICATE_THRESHOLD"] if duplicate_threshold is None else duplicate_threshold
+        )
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if not TRANSACTION_RE.match(sql):
+                self.queries.append((sql, (time.perf_counter() - started) * 1000))
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def groups(self):
+        """``{normalized sql: [duration_ms, ...]}`` in the order statements were first run."""
+        groups = defaultdict(list)
+        for sql, duration in self.queries:
+            groups[normalize_sql(sql)].append(duration)
+        return groups
+
+    def duplicates(self):
+        """``(normalized sql, times run)`` for every statement repeated at least duplicate_threshold times."""
+        return [
+            (sql, len(durations))
+            for sql, durations in self.groups().items()
+            if len(durations) >= self.duplicate_threshold
+        ]
+
+    def slow_queries(self):
+        return [(sql, duration) for sql, duration in self.queries if duration >= self.slow_query_ms]
+
+    def problems(self):
+        problems = [f"{times}x (possible N+1): {sql}" for sql, times in self.duplicates()]
+        problems += [f"slow ({duration:.0f} ms): {sql}" for sql, duration in self.slow_queries()]
+        return problems
+
+
+@contextmanager
+def inspect_queries(**options):
+    """Record the queries run on every database connection inside the block."""
+    inspector = QueryInspector(**options)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(inspector))
+        yield inspector
+
+
+def log_problems(request, inspector):
+    """Default REPORTER: one warning per request that has findings."""
+    logger.warning(
+        "%s %s ran %d queries:\n  %s",
+        request.method, request.path, inspector.count, "\n  ".join(inspector.problems()),
+    )
+
+
+class QueryInspectorMiddleware:
+    """Inspect every request's queries; unloads itself unless QUERY_INSPECTOR["ENABLED"] is set."""
+
+    def __init__(self, get_response):
+        options = inspector_settings()
+        if not options["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.report = import_string(options["REPORTER"])
+
+    def __call__(self, request):
+        with inspect_queries() as inspector:
+            response = self.get_response(request)
+        if inspector.problems():
+            self.report(request, inspector)
+        return response
+
+
+class QueryBaseline:
+    """
+    Recorded query counts per key (a view name) in a JSON file.
+
+    ``check`` returns an error message when a count goes above its baseline
+    or has no baseline yet. With UPDATE_QUERY_BASELINE=1 in the environment
+    it records the counts instead, and ``save`` writes them back.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.updating = os.environ.get("UPDATE_QUERY_BASELINE") == "1"
+        try:
+            with open(path) as baseline_file:
+                self.counts = json.load(baseline_file)
+        except FileNotFoundError:
+            self.counts = {}
+
+    def check(self, key, count):
+        if self.updating:
+            self.counts[key] = count
+            return None
+        baseline = self.counts.get(key)
+        if baseline is None:
+            return f"No query baseline for {key!r} ({count} queries); rerun with UPDATE_QUERY_BASELINE=1."
+        if count > baseline:
+            return f"{key!r} ran {count} queries, up from the baseline of {baseline}."
+        return None
+
+    def save(self):
+        if not self.updating:
+            return
+        with open(self.path, "w") as baseline_file:
+            json.dump(dict(sorted(self.counts.items())), baseline_file, indent=2)
+            baseline_file.write("\n")
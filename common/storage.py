@@ -0,0 +1,82 @@
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+from .models import StoredBlob
+
+
+def file_sha256(file) -> str:
+    """SHA-256 of a file, reusing a digest computed while it was uploaded (``file.sha256``)."""
+    digest = getattr(file, "sha256", None)
+    if digest:
+        return digest
+    sha256 = hashlib.sha256()
+    if hasattr(file, "seek"):
+        file.seek(0)
+    for chunk in file.chunks():
+        sha256.update(chunk)
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return sha256.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that names every blob after the SHA-256 of its content.
+
+    ``save("cvs/My CV.pdf", content)`` stores ``cvs/ab/cd/abcd...ef.pdf``.
+    Saving identical content again writes nothing and returns the same name.
+    Each save takes a reference on the blob (a StoredBlob row) and each
+    delete drops one, so a blob is only removed from disk once nothing
+    points at it any more.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(**kwargs)
+
+    def content_name(self, name: str, content) -> str:
+        digest = file_sha256(content)
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return os.path.join(directory, digest[:2], digest[2:4], f"{digest}{extension}")
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        name = self.content_name(name, content)
+        # The existence check and the new reference are one transaction, so a
+        # concurrent delete_if_unreferenced() cannot unlink the file in between.
+        with transaction.atomic():
+            if not self.exists(name):
+                name = self._save(name, content)
+
+            blob, _ = StoredBlob.objects.get_or_create(name=name, defaults={"size": content.size})
+            StoredBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+        return name
+
+    def delete(self, name):
+        """Drop one reference; the file goes once the last reference is committed away."""
+        StoredBlob.objects.filter(name=name, ref_count__gt=0).update(ref_count=F("ref_count") - 1)
+        transaction.on_commit(lambda: self.delete_if_unreferenced(name))
+
+    def delete_if_unreferenced(self, name) -> bool:
+        """
+        Remove the blob if no reference to it is recorded. Returns True if it was removed.
+
+        Only a row still at zero references is deleted, so a save() that took a new
+        reference since delete() was called keeps the file.
+        """
+        with transaction.atomic():
+            deleted, _ = StoredBlob.objects.filter(name=name, ref_count=0).delete()
+            if not deleted and StoredBlob.objects.filter(name=name).exists():
+                return False
+            super().delete(name)
+        return True
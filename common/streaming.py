@@ -0,0 +1,80 @@
+import csv
+import zipfile
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class _Echo:
+    """Pseudo-buffer for csv.writer: hands back each formatted row instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+# A text cell starting with one of these is run as a formula by Excel, LibreOffice and Google Sheets.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def sanitize_cell(value):
+    """Prefix text that a spreadsheet would evaluate as a formula with ``'``, so it is shown as text."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_stream(header, rows):
+    """Yield a CSV document line by line (UTF-8 bytes) from an iterable of rows, with every cell sanitized."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header).encode()
+    for row in rows:
+        yield writer.writerow([sanitize_cell(value) for value in row]).encode()
+
+
+def jsonl_stream(objects):
+    """Yield one JSON document per line (UTF-8 bytes); dates, UUIDs and decimals are serialized as strings."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for obj in objects:
+        yield (encoder.encode(obj) + "\n").encode()
+
+
+class _ChunkSink:
+    """Write-only file object that collects what zipfile writes until it is drained."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def zip_stream(members, compression=zipfile.ZIP_STORED):
+    """
+    Build a ZIP archive on the fly and yield it in pieces.
+
+    ``members`` is an iterable of ``(arcname, chunks)`` pairs where ``chunks``
+    yields bytes. The sink is not seekable, so zipfile writes a data descriptor
+    after each member instead of seeking back; nothing is buffered beyond the
+    chunk being written, and no temporary file is used.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=compression) as archive:
+        for arcname, chunks in members:
+            with archive.open(arcname, mode="w") as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
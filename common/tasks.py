@@ -1,11 +1,130 @@
-from django.core.mail import EmailMultiAlternatives
+from datetime import timedelta
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F
 from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import EmailJob, EmailStatus
+
+DEFAULT_FROM_EMAIL = "noreply@talentbase.com"
+
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF_SECONDS = 30
+LEASE_SECONDS = 5 * 60
+
 
 def send_email(subject: str,email_to: list[str], html_template,context):
-    msg=EmailMultiAlternatives(
-        subject=subject,from_email="noreply@talentbase.com",to=email_to
-    )
+    """Render the email now and queue it in the outbox; the process_email_queue worker sends it."""
     html_template=get_template(html_template)
     html_alternative=html_template.render(context)
-    msg.attach_alternative(html_alternative,"text/html")
-    msg.send(fail_silently=False)
+    return EmailJob.objects.create(
+        subject=subject,
+        from_email=DEFAULT_FROM_EMAIL,
+        to=list(email_to),
+        html_body=html_alternative,
+    )
+
+
+def send_mass_email(datatuple, html_template) -> int:
+    """
+    Queue many emails that share one template, in the spirit of send_mass_mail.
+
+    ``datatuple`` yields ``(subject, email_to, context)``. The template is
+    compiled once for the whole batch and the jobs are inserted with
+    bulk_create; the worker then delivers them over a single connection.
+    """
+    html_template=get_template(html_template)
+    jobs = [
+        EmailJob(
+            subject=subject,
+            from_email=DEFAULT_FROM_EMAIL,
+            to=list(email_to),
+            html_body=html_template.render(context),
+        )
+        for subject, email_to, context in datatuple
+    ]
+    EmailJob.objects.bulk_create(jobs, batch_size=500)
+    return len(jobs)
+
+
+def build_message(job: EmailJob, connection=None) -> EmailMultiAlternatives:
+    msg=EmailMultiAlternatives(
+        subject=job.subject,from_email=job.from_email,to=job.to,connection=connection
+    )
+    msg.attach_alternative(job.html_body,"text/html")
+    return msg
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff: 30s, 60s, 120s, ... after the 1st, 2nd, 3rd failure."""
+    return timedelta(seconds=RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1))
+
+
+def claim_due_jobs(limit: int) -> list[EmailJob]:
+    """
+    Lease up to ``limit`` due jobs to this worker.
+
+    Claiming pushes ``next_attempt_at`` past the lease window with a conditional
+    UPDATE, so two workers never send the same job, and a job whose worker died
+    mid-send becomes due again once the lease expires.
+    """
+    now = timezone.now()
+    candidates = EmailJob.objects.filter(
+        status=EmailStatus.PENDING, next_attempt_at__lte=now
+    ).values_list("pk", "next_attempt_at")[:limit]
+
+    claimed = []
+    lease_until = now + timedelta(seconds=LEASE_SECONDS)
+    for pk, next_attempt_at in candidates:
+        updated = EmailJob.objects.filter(
+            pk=pk, status=EmailStatus.PENDING, next_attempt_at=next_attempt_at
+        ).update(next_attempt_at=lease_until, attempts=F("attempts") + 1)
+        if updated:
+            claimed.append(pk)
+    return list(EmailJob.objects.filter(pk__in=claimed))
+
+
+def deliver_email_job(job: EmailJob, connection=None) -> bool:
+    """Send a claimed job, recording success, a scheduled retry or a dead letter."""
+    try:
+        build_message(job, connection).send(fail_silently=False)
+    except Exception as exc:
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = EmailStatus.DEAD_LETTER
+        else:
+            job.next_attempt_at = timezone.now() + retry_delay(job.attempts)
+        job.save(update_fields=["status", "next_attempt_at", "last_error", "updated_at"])
+        return False
+
+    job.status = EmailStatus.SENT
+    job.sent_at = timezone.now()
+    job.last_error = ""
+    job.save(update_fields=["status", "sent_at", "last_error", "updated_at"])
+    return True
+
+
+def process_email_queue(batch_size: int = 50) -> tuple[int, int]:
+    """Deliver one batch of due jobs over a single connection. Returns (sent, failed)."""
+    jobs = claim_due_jobs(batch_size)
+    if not jobs:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception:
+        # Let each job record the connection failure and back off individually.
+        connection = None
+    try:
+        for job in jobs:
+            if deliver_email_job(job, connection):
+                sent += 1
+            else:
+                failed += 1
+    finally:
+        if connection is not None:
+            connection.close()
+    return sent, failed
@@ -0,0 +1,73 @@
+"""Fixtures and assertions shared by the apps' test suites."""
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+
+from accounts.models import User
+from application_tracking.models import JobAdvert, JobApplication, Question
+from common.queries import QueryBaseline, inspect_queries
+
+
+def create_company(email="company@example.com"):
+    return User.objects.create_user(email=email, password="password", role="company")
+
+
+def create_application(advert, email="candidate@example.com"):
+    return JobApplication.objects.create(
+        job_advert=advert, name="Candidate", email=email, portfolio_url="https://example.com", cv="cvs/cv.pdf"
+    )
+
+
+def create_question(category):
+    return Question.objects.create(
+        category=category, question_text="Question?", option1="a", option2="b", option3="c", option4="d",
+        correct_option="option1",
+    )
+
+
+def create_advert(created_by, **fields):
+    defaults = {
+        "title": "Python Developer",
+        "company_name": "Acme",
+        "employment_type": "Full Time",
+        "experience_level": "Entry Level",
+        "description": "Build things.",
+        "job_type": "Remote",
+        "deadline": date(2099, 1, 1),
+        "skills": "python, django",
+    }
+    defaults.update(fields)
+    return JobAdvert.objects.create(created_by=created_by, **defaults)
+
+
+BASELINE = QueryBaseline(settings.QUERY_BASELINE_FILE)
+
+
+class QueryCountMixin:
+    """
+    Hold a page to its recorded query count in query_baseline.json (see
+    common.queries.QueryBaseline). Fixtures create several rows of everything
+    a page lists, so a template that starts loading a relation per row pushes
+    the count up, and repeats the same statement, and fails the guard.
+    """
+
+    @classmethod
+    def tearDownClass(cls):
+        BASELINE.save()
+        super().tearDownClass()
+
+    def assertViewQueries(self, user, url, key):
+        cache.clear()
+        self.client.force_login(user)
+        with inspect_queries() as inspector:
+            response = self.client.get(url)
+            # A streamed body runs its queries while it is consumed.
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(inspector.duplicates(), [])
+        error = BASELINE.check(key, inspector.count)
+        if error:
+            self.fail(error)
+        return response
@@ -0,0 +1,322 @@
+import csv
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from smtplib import SMTPException
+
+from django.core import mail, signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.base import ContentFile
+from django.core.mail.backends import locmem
+from django.db import connection
+from django.http import HttpResponse
+from django.template.backends.django import Template
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from application_tracking.models import JobAdvert
+from .models import EmailJob, EmailStatus, StoredBlob
+from .pagination import CursorPaginator
+from .performance import PerformanceMiddleware, PerformanceStore, store as performance_store
+from .storage import ContentAddressedStorage
+from .streaming import csv_stream
+from .tasks import MAX_ATTEMPTS, claim_due_jobs, process_email_queue, retry_delay, send_email
+from .testing import create_advert, create_company
+
+
+class ContentAddressedStorageTests(TestCase):
+
+    def setUp(self):
+        self.storage = ContentAddressedStorage(location=tempfile.mkdtemp())
+
+    def save(self, filename="cv.pdf", content=b"%PDF-1.4 cv"):
+        return self.storage.save(f"cvs/{filename}", ContentFile(content))
+
+    def ref_count(self, name):
+        return StoredBlob.objects.get(name=name).ref_count
+
+    def files(self):
+        return [name for _, _, files in os.walk(self.storage.location) for name in files]
+
+    def delete(self, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.delete(name)
+
+    def test_identical_content_is_stored_once(self):
+        first = self.save("first.PDF")
+        second = self.save("second.pdf")
+
+        self.assertEqual(first, second)
+        self.assertRegex(first, r"^cvs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$")
+        self.assertEqual(len(self.files()), 1)
+        self.assertEqual(self.ref_count(first), 2)
+
+    def test_file_removed_with_last_reference(self):
+        name = self.save()
+        self.save()
+
+        self.delete(name)
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.ref_count(name), 1)
+
+        self.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(StoredBlob.objects.filter(name=name).exists())
+
+    def test_reference_taken_before_cleanup_keeps_file(self):
+        name = self.save()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.storage.delete(name)
+        self.assertEqual(self.ref_count(name), 0)
+
+        # Another upload of the same content lands before the cleanup hook runs.
+        self.save()
+        for callback in callbacks:
+            callback()
+
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.ref_count(name), 1)
+
+    def test_distinct_content_is_stored_separately(self):
+        self.assertNotEqual(self.save(content=b"one"), self.save(content=b"two"))
+        self.assertEqual(len(self.files()), 2)
+
+
+class FailingEmailBackend(locmem.EmailBackend):
+
+    def send_messages(self, messages):
+        raise SMTPException("Connection refused")
+
+
+def queue_email(to="candidate@example.com"):
+    return send_email(
+        "Application Outcome", [to], "emails/job_application_update.html",
+        {"applicant_name": "Candidate", "job_title": "Python Developer", "company_name": "Acme"},
+    )
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class EmailOutboxTests(TestCase):
+
+    def test_send_email_only_queues(self):
+        job = queue_email()
+
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(job.status, EmailStatus.PENDING)
+        self.assertEqual(job.to, ["candidate@example.com"])
+        self.assertIn("Python Developer", job.html_body)
+
+    def test_worker_delivers_and_marks_sent(self):
+        job = queue_email()
+
+        self.assertEqual(process_email_queue(), (1, 0))
+
+        [message] = mail.outbox
+        self.assertEqual(message.subject, "Application Outcome")
+        self.assertEqual(message.to, ["candidate@example.com"])
+        self.assertEqual(message.alternatives[0][1], "text/html")
+        job.refresh_from_db()
+        self.assertEqual(job.status, EmailStatus.SENT)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.sent_at)
+        self.assertEqual(process_email_queue(), (0, 0))
+
+    @override_settings(EMAIL_BACKEND="common.tests.FailingEmailBackend")
+    def test_failure_backs_off(self):
+        job = queue_email()
+
+        before = timezone.now()
+        self.assertEqual(process_email_queue(), (0, 1))
+        after = timezone.now()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, EmailStatus.PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.last_error, "SMTPException: Connection refused")
+        self.assertTrue(before + retry_delay(1) <= job.next_attempt_at <= after + retry_delay(1))
+        self.assertEqual(retry_delay(2), 2 * retry_delay(1))
+        # Not due again until the backoff has passed.
+        self.assertEqual(process_email_queue(), (0, 0))
+
+    @override_settings(EMAIL_BACKEND="common.tests.FailingEmailBackend")
+    def test_dead_letter_after_max_attempts(self):
+        job = queue_email()
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            EmailJob.objects.filter(pk=job.pk).update(next_attempt_at=timezone.now())
+            self.assertEqual(process_email_queue(), (0, 1))
+            job.refresh_from_db()
+            self.assertEqual(job.attempts, attempt)
+
+        self.assertEqual(job.status, EmailStatus.DEAD_LETTER)
+        EmailJob.objects.filter(pk=job.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(claim_due_jobs(10), [])
+
+    def test_claimed_job_is_leased(self):
+        job = queue_email()
+
+        self.assertEqual(claim_due_jobs(10), [job])
+        self.assertEqual(claim_due_jobs(10), [])
+
+        # A worker that died mid-send: the job is claimable again once the lease expires.
+        EmailJob.objects.filter(pk=job.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        [reclaimed] = claim_due_jobs(10)
+        self.assertEqual(reclaimed.attempts, 2)
+
+
+class ConcurrentClaimTests(TransactionTestCase):
+
+    def test_concurrent_workers_never_share_a_job(self):
+        jobs = {queue_email(f"candidate{i}@example.com").pk for i in range(20)}
+        workers = 4
+        barrier = threading.Barrier(workers)
+        claimed, errors = [], []
+
+        def work():
+            try:
+                barrier.wait()
+                claimed.extend(job.pk for job in claim_due_jobs(len(jobs)))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(claimed), len(set(claimed)))
+        self.assertEqual(set(claimed), jobs)
+
+
+class CursorPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        company = create_company()
+        start = timezone.now()
+        # Runs of equal created_at values, so pages break inside a tie and the id decides.
+        for i, minutes in enumerate((0, 0, 0, 1, 1, 2, 2)):
+            advert = create_advert(company, title=f"Advert {i}")
+            JobAdvert.objects.filter(pk=advert.pk).update(created_at=start + timedelta(minutes=minutes))
+        cls.ordered = list(JobAdvert.objects.order_by("-created_at", "-id"))
+
+    def setUp(self):
+        self.paginator = CursorPaginator(JobAdvert.objects.all(), per_page=3)
+
+    def walk(self, page, cursor_attribute):
+        pages = [page]
+        while getattr(pages[-1], cursor_attribute):
+            pages.append(self.paginator.get_page(getattr(pages[-1], cursor_attribute)))
+        return pages
+
+    def test_forward_and_backward_through_ties(self):
+        forward = self.walk(self.paginator.get_page(None), "next_cursor")
+        self.assertEqual([len(page) for page in forward], [3, 3, 1])
+        self.assertEqual([advert for page in forward for advert in page], self.ordered)
+        self.assertFalse(forward[0].has_previous())
+        self.assertFalse(forward[-1].has_next())
+
+        backward = self.walk(forward[-1], "previous_cursor")
+        self.assertEqual([list(page) for page in backward], [list(page) for page in reversed(forward)])
+        self.assertTrue(backward[-1].has_next())
+        self.assertFalse(backward[-1].has_previous())
+
+    def test_bad_cursor_falls_back_to_the_first_page(self):
+        next_cursor = self.paginator.get_page(None).next_cursor
+        wrong_shape = signing.dumps({"v": ["2024-01-01"], "b": False}, salt=CursorPaginator.salt, compress=True)
+        for cursor in (next_cursor[:-2] + "xx", "not-a-cursor", wrong_shape):
+            with self.subTest(cursor):
+                page = self.paginator.get_page(cursor)
+                self.assertEqual(list(page), self.ordered[:3])
+                self.assertFalse(page.has_previous())
+
+    def test_one_query_and_no_count(self):
+        cursor = self.paginator.get_page(None).next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            page = self.paginator.get_page(cursor)
+            list(page)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("COUNT(", queries[0]["sql"].upper())
+        self.assertIn("LIMIT 4", queries[0]["sql"])
+
+
+class CsvStreamTests(TestCase):
+
+    def test_formula_cells_are_neutralised(self):
+        rows = [("=SUM(A1:A2)", "+44 20 7946 0000", "-1", "@user", "\tindent", "plain", -1, None)]
+        document = b"".join(csv_stream(("a", "b", "c", "d", "e", "f", "g", "h"), rows)).decode()
+
+        self.assertEqual(list(csv.reader(document.splitlines()))[1], [
+            "'=SUM(A1:A2)", "'+44 20 7946 0000", "'-1", "'@user", "'\tindent", "plain", "-1", "",
+        ])
+
+
+class PerformanceStoreTests(TestCase):
+
+    def sample(self, value, response_bytes=None):
+        return {
+            "total_ms": value, "db_ms": value / 10, "queries": 3, "template_ms": 0.0, "response_bytes": response_bytes,
+        }
+
+    def test_percentiles(self):
+        store = PerformanceStore()
+        for value in range(100, 0, -1):
+            store.record("search", self.sample(value))
+
+        stats = store.summary()["search"]
+        self.assertEqual(stats["count"], 100)
+        self.assertEqual(stats["total_ms"], {"p50": 50, "p90": 90, "p99": 99, "max": 100})
+        self.assertEqual(stats["db_ms"]["p90"], 9.0)
+        self.assertEqual(stats["queries"], {"p50": 3, "p90": 3, "p99": 3, "max": 3})
+        # Streaming responses have no size; a metric without values is left out.
+        self.assertNotIn("response_bytes", stats)
+
+    def test_keeps_a_rolling_window(self):
+        store = PerformanceStore(size=10)
+        for value in range(1, 21):
+            store.record("search", self.sample(value, response_bytes=value))
+
+        stats = store.summary()["search"]
+        self.assertEqual(stats["count"], 10)
+        self.assertEqual(stats["total_ms"]["p50"], 15)
+        self.assertEqual(stats["response_bytes"]["max"], 20)
+        store.reset()
+        self.assertEqual(store.summary(), {})
+
+
+class PerformanceMiddlewareTests(TestCase):
+
+    def setUp(self):
+        performance_store.reset()
+        self.addCleanup(performance_store.reset)
+
+    @override_settings(PERFORMANCE_MONITORING=False)
+    def test_unloads_itself_when_off(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            PerformanceMiddleware(lambda request: HttpResponse())
+        self.assertNotIn("Server-Timing", self.client.get(reverse("search")))
+
+    @override_settings(PERFORMANCE_MONITORING=True)
+    def test_records_each_request(self):
+        render = Template.render
+        self.client.force_login(User.objects.create_user(email="candidate@example.com", password="password"))
+
+        response = self.client.get(reverse("search"))
+
+        self.assertRegex(
+            response["Server-Timing"], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+$'
+        )
+        stats = performance_store.summary()["search"]
+        self.assertEqual(stats["count"], 1)
+        self.assertGreater(stats["queries"]["max"], 0)
+        self.assertGreater(stats["template_ms"]["max"], 0)
+        self.assertEqual(stats["response_bytes"]["max"], len(response.content))
+        # The render wrapper only exists while a measured request is in flight.
+        self.assertIs(Template.render, render)